@@ -0,0 +1,48 @@
+# batching.py
+"""
+Length-bucketed batching capped by total tokens
+Used by train_ner_model.py for training batches and by resume_parser.py
+for bulk inference. Items are read a buffer at a time, sorted by length
+and cut into batches whose padded size (batch length x longest item)
+stays under a token budget, so short and long resumes are not mixed.
+"""
+
+import random
+
+def bucketed_batches(items, length, max_tokens, max_items=None, buffer_size=1000, shuffle=False):
+    """Yield lists of items grouped by similar `length(item)`
+    
+    A batch holds as many items as fit in `max_tokens` once padded to
+    its longest item (and at most `max_items`); an item longer than the
+    budget gets a batch of its own. Batches from one buffer come out
+    shortest first, or in random order with `shuffle`. Callers that need
+    input order must restore it themselves.
+    """
+    buffer = []
+    for item in items:
+        buffer.append((length(item), item))
+        if len(buffer) >= buffer_size:
+            yield from _cut_buffer(buffer, max_tokens, max_items, shuffle)
+            buffer = []
+    if buffer:
+        yield from _cut_buffer(buffer, max_tokens, max_items, shuffle)
+
+def _cut_buffer(buffer, max_tokens, max_items, shuffle):
+    """Sort one buffer by length and split it under the token budget"""
+    buffer.sort(key=lambda pair: pair[0])
+    batches = []
+    batch = []
+    for item_length, item in buffer:
+        # Sorted ascending, so the newcomer is the longest in the batch
+        too_big = (len(batch) + 1) * item_length > max_tokens
+        too_many = max_items is not None and len(batch) >= max_items
+        if batch and (too_big or too_many):
+            batches.append(batch)
+            batch = []
+        batch.append(item)
+    if batch:
+        batches.append(batch)
+    
+    if shuffle:
+        random.shuffle(batches)
+    return batches
@@ -0,0 +1,295 @@
+# benchmark.py
+"""
+Throughput and latency benchmarks for the resume pipeline stages
+Usage: python benchmark.py [--docs 200] [--corpus synthetic|extracted_resumes.json]
+                           [--baseline benchmark_baseline.json] [--save-baseline]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue as queue_module
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+import traceback
+
+STAGES = ('extract_pdf', 'auto_annotate', 'parse')
+
+SKILLS = ['Python', 'Java', 'SQL', 'Machine Learning', 'Deep Learning', 'TensorFlow',
+          'PyTorch', 'AWS', 'Docker', 'Kubernetes', 'React', 'Node.js', 'Django',
+          'Flask', 'Data Science', 'NLP', 'Computer Vision', 'MongoDB', 'Git']
+TITLES = ['Software Engineer', 'Data Scientist', 'Data Analyst', 'ML Engineer',
+          'Backend Developer', 'DevOps Engineer', 'Project Manager', 'Research Intern']
+FILLER = ['Developed', 'scalable', 'services', 'improving', 'latency', 'by', 'the',
+          'team', 'with', 'and', 'designed', 'pipelines', 'for', 'analysis', 'of',
+          'customer', 'data', 'leading', 'to', 'increased', 'revenue', 'across', 'regions']
+
+def synthetic_resume(rng, target_chars):
+    """Build a resume-like text of roughly `target_chars` characters"""
+    lines = [f"{rng.choice(['John', 'Asha', 'Wei', 'Maria'])} {rng.choice(['Doe', 'Rao', 'Li', 'Silva'])}",
+             rng.choice(TITLES), "Experience:"]
+    size = sum(len(line) for line in lines)
+    while size < target_chars:
+        if rng.random() < 0.2:
+            line = f"{rng.choice(TITLES)} at Company{rng.randint(1, 500)} ({rng.randint(2010, 2024)})"
+        else:
+            words = rng.choices(FILLER, k=rng.randint(6, 14)) + rng.choices(SKILLS, k=rng.randint(1, 3))
+            rng.shuffle(words)
+            line = "• " + " ".join(words)
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+def synthetic_corpus(n_docs, mean_chars=3000, sigma=0.6, seed=0):
+    """Synthetic resumes with log-normally distributed lengths around `mean_chars`"""
+    rng = random.Random(seed)
+    return [synthetic_resume(rng, max(200, int(rng.lognormvariate(0, sigma) * mean_chars)))
+            for _ in range(n_docs)]
+
+def recorded_corpus(path, n_docs=None):
+    """Load texts from extracted_resumes.json or training_data.json style files"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    texts = [item['text'] if isinstance(item, dict) else item[0] for item in data]
+    if n_docs:
+        # Repeat the recorded texts to reach the requested corpus size
+        texts = [texts[i % len(texts)] for i in range(n_docs)]
+    return texts
+
+def _pdf_escape(line):
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+def write_text_pdf(text, file_path, lines_per_page=60):
+    """Write a minimal text-only PDF so PDF extraction can be benchmarked without fixtures"""
+    lines = [line.encode('latin-1', 'replace').decode('latin-1') for line in text.split("\n")]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)] or [[]]
+    
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    page_ids = []
+    for page in pages:
+        body = "BT /F1 10 Tf 12 TL 40 780 Td " + " ".join(f"({_pdf_escape(l)}) '" for l in page) + " ET"
+        objects.append(f"<< /Length {len(body.encode('latin-1'))} >>\nstream\n{body}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        page_ids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] /Count {len(page_ids)} >>"
+    
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n".encode('latin-1')
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1')
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode('latin-1')
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1')
+    
+    with open(file_path, 'wb') as f:
+        f.write(out)
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def _run_stage(stage, texts, model_path, queue):
+    """Run one stage in a child process and report timings plus peak RSS, or the error"""
+    workdir = None
+    try:
+        if stage == 'extract_pdf':
+            from extract_resumes import extract_text_from_file
+            workdir = tempfile.mkdtemp(prefix='bench_pdf_')
+            inputs = []
+            for i, text in enumerate(texts):
+                file_path = os.path.join(workdir, f"resume_{i}.pdf")
+                write_text_pdf(text, file_path)
+                inputs.append(file_path)
+            func = extract_text_from_file
+        elif stage == 'auto_annotate':
+            from quick_annotator import QuickAnnotator
+            func = QuickAnnotator().find_entities_auto
+            inputs = texts
+        else:
+            from resume_parser import ResumeParser
+            func = ResumeParser(model_path).parse_resume
+            inputs = texts
+        
+        func(inputs[0])  # warm-up, not timed
+        
+        latencies = []
+        start = time.perf_counter()
+        for item in inputs:
+            t0 = time.perf_counter()
+            func(item)
+            latencies.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - start
+        
+        # ru_maxrss is in KiB on Linux
+        queue.put({'latencies': latencies, 'elapsed': elapsed,
+                   'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024})
+    except BaseException:
+        queue.put({'error': traceback.format_exc()})
+    finally:
+        if workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+def benchmark_stage(stage, texts, model_path=None, timeout=3600):
+    """Measure docs/sec, chars/sec, latency percentiles and peak RSS for one stage
+    
+    Raises RuntimeError if the stage fails, its process dies, or it does
+    not finish within `timeout` seconds.
+    """
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_run_stage, args=(stage, texts, model_path, queue))
+    process.start()
+    deadline = time.monotonic() + timeout
+    raw = None
+    while raw is None:
+        try:
+            raw = queue.get(timeout=1)
+        except queue_module.Empty:
+            if not process.is_alive():
+                # The result may have been put just before the process exited
+                try:
+                    raw = queue.get(timeout=1)
+                except queue_module.Empty:
+                    process.join()
+                    raise RuntimeError(f"stage {stage} exited with code {process.exitcode} "
+                                       f"without reporting results")
+            elif time.monotonic() > deadline:
+                process.terminate()
+                process.join()
+                raise RuntimeError(f"stage {stage} did not finish within {timeout}s")
+    process.join()
+    if 'error' in raw:
+        raise RuntimeError(f"stage {stage} failed:\n{raw['error']}")
+    
+    latencies = sorted(raw['latencies'])
+    total_chars = sum(len(text) for text in texts)
+    elapsed = raw['elapsed']
+    return {
+        'docs': len(texts),
+        'docs_per_sec': len(texts) / elapsed if elapsed else 0.0,
+        'chars_per_sec': total_chars / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'peak_rss_mb': raw['peak_rss_mb'],
+    }
+
+def find_regressions(results, baseline, tolerance=0.10):
+    """Compare against a stored baseline; returns a list of human-readable regressions"""
+    regressions = []
+    if (baseline.get('corpus'), baseline.get('docs')) != (results['corpus'], results['docs']):
+        print(f"⚠️  Baseline used a different corpus ({baseline.get('corpus')}, "
+              f"{baseline.get('docs')} docs); comparison may be misleading")
+    for stage, metrics in results['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if not base:
+            continue
+        if metrics['docs_per_sec'] < base['docs_per_sec'] * (1 - tolerance):
+            regressions.append(f"{stage}: docs/sec {metrics['docs_per_sec']:.1f} "
+                               f"vs baseline {base['docs_per_sec']:.1f}")
+        for key in ('p95_ms', 'p99_ms'):
+            if metrics[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{stage}: {key} {metrics[key]:.2f} vs baseline {base[key]:.2f}")
+        if metrics['peak_rss_mb'] > base['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f"{stage}: peak RSS {metrics['peak_rss_mb']:.0f}MB "
+                               f"vs baseline {base['peak_rss_mb']:.0f}MB")
+    return regressions
+
+def run_benchmarks(texts, stages=STAGES, model_path=None, corpus_name='synthetic',
+                   timeout=3600):
+    """Benchmark each stage over `texts` and print a summary table"""
+    results = {
+        'corpus': corpus_name,
+        'docs': len(texts),
+        'mean_chars': sum(len(text) for text in texts) / len(texts),
+        'stages': {},
+    }
+    
+    print("="*80)
+    print(f"PIPELINE BENCHMARK - {len(texts)} docs ({corpus_name}), "
+          f"mean {results['mean_chars']:.0f} chars")
+    print("="*80)
+    print(f"{'STAGE':15s} {'docs/s':>9s} {'chars/s':>11s} {'p50 ms':>8s} {'p95 ms':>8s} "
+          f"{'p99 ms':>8s} {'RSS MB':>8s}")
+    
+    for stage in stages:
+        metrics = benchmark_stage(stage, texts, model_path, timeout)
+        results['stages'][stage] = metrics
+        print(f"{stage:15s} {metrics['docs_per_sec']:9.1f} {metrics['chars_per_sec']:11.0f} "
+              f"{metrics['p50_ms']:8.2f} {metrics['p95_ms']:8.2f} {metrics['p99_ms']:8.2f} "
+              f"{metrics['peak_rss_mb']:8.0f}")
+    
+    return results
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark the resume pipeline")
+    arg_parser.add_argument('--docs', type=int, default=200, help="number of documents")
+    arg_parser.add_argument('--corpus', default='synthetic',
+                            help="'synthetic' or a JSON file of recorded resumes")
+    arg_parser.add_argument('--mean-chars', type=int, default=3000,
+                            help="mean synthetic resume length")
+    arg_parser.add_argument('--stages', default=','.join(STAGES), help="comma-separated stages")
+    arg_parser.add_argument('--model', default=None,
+                            help="model dir or .pack file (default: fresh pack, else directory)")
+    arg_parser.add_argument('--output', default='benchmark_results.json')
+    arg_parser.add_argument('--baseline', default='benchmark_baseline.json')
+    arg_parser.add_argument('--save-baseline', action='store_true',
+                            help="store these results as the new baseline")
+    arg_parser.add_argument('--tolerance', type=float, default=0.10,
+                            help="allowed slowdown before flagging a regression")
+    arg_parser.add_argument('--timeout', type=float, default=3600,
+                            help="seconds allowed per stage before it is stopped")
+    args = arg_parser.parse_args()
+    
+    if args.corpus == 'synthetic':
+        texts = synthetic_corpus(args.docs, mean_chars=args.mean_chars)
+    else:
+        texts = recorded_corpus(args.corpus, args.docs)
+    
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+    unknown = [stage for stage in stages if stage not in STAGES]
+    if unknown or not stages:
+        arg_parser.error(f"unknown stage(s) {', '.join(unknown) or '(none given)'}; "
+                         f"choose from {', '.join(STAGES)}")
+    
+    try:
+        results = run_benchmarks(texts, stages, args.model, corpus_name=args.corpus,
+                                 timeout=args.timeout)
+    except RuntimeError as e:
+        print(f"\n❌ {e}")
+        sys.exit(1)
+    
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results saved to: {args.output}")
+    
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"✅ Baseline saved to: {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = find_regressions(results, baseline, args.tolerance)
+        if regressions:
+            print("\n❌ Regressions against baseline:")
+            for regression in regressions:
+                print(f"  • {regression}")
+            sys.exit(1)
+        print("\n✅ No regressions against baseline")
+
+if __name__ == "__main__":
+    main()
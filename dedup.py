@@ -0,0 +1,102 @@
+# dedup.py
+"""
+Exact and near-duplicate detection for resume texts
+Exact copies are found by a hash of the text. Near copies (the same CV
+lightly edited or re-exported) are found with MinHash signatures of
+word shingles, bucketed by LSH bands so each resume is only compared
+with the few representatives it shares a band with.
+
+Texts are grouped greedily in input order: the first of a group is its
+representative, and a later text joins the most similar representative
+at or above the threshold. Every member is therefore close to the
+representative whose parse it reuses, which is not guaranteed when
+near-duplicate pairs are chained together.
+"""
+
+import hashlib
+import re
+import zlib
+import numpy as np
+
+WORD = re.compile(r'\w+')
+
+# A prime just above 2**32: 32-bit hashes times 32-bit coefficients stay within uint64
+HASH_PRIME = np.uint64(4294967311)
+
+def _lsh_shape(num_perm, threshold, recall=0.99):
+    """(bands, rows) for LSH over `num_perm` hashes
+    
+    The most rows per band (fewest false candidates) that still make a
+    pair at `threshold` similarity share a band with probability `recall`.
+    """
+    for rows in range(num_perm, 0, -1):
+        bands = num_perm // rows
+        if 1 - (1 - threshold ** rows) ** bands >= recall:
+            return bands, rows
+    return num_perm, 1
+
+class Deduplicator:
+    """Assign texts to duplicate groups as they arrive"""
+    
+    def __init__(self, threshold=0.9, num_perm=128, shingle_size=5, seed=1):
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, 2**32, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 2**32, size=num_perm, dtype=np.uint64)
+        self.bands, self.rows = _lsh_shape(num_perm, threshold)
+        
+        self.exact = {}  # text hash -> (representative key, similarity)
+        self.signatures = {}  # representative key -> MinHash signature
+        self.buckets = [{} for _ in range(self.bands)]  # band value -> representative keys
+    
+    def signature(self, text):
+        """MinHash signature of the text's lowercased word shingles"""
+        words = WORD.findall(text.lower())
+        n = self.shingle_size
+        shingles = {' '.join(words[i:i + n]) for i in range(max(1, len(words) - n + 1))}
+        hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                             dtype=np.uint64, count=len(shingles))
+        return ((np.outer(self.a, hashes) + self.b[:, None]) % HASH_PRIME).min(axis=1)
+    
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [signature[band * rows:(band + 1) * rows].tobytes() for band in range(self.bands)]
+    
+    def add(self, key, text):
+        """Group `text` under `key`: returns (representative key, similarity)
+        
+        A text that starts a new group is its own representative, with
+        similarity 1.0. Similarity to a near duplicate's representative
+        is the MinHash estimate of their shingle Jaccard similarity.
+        """
+        digest = hashlib.sha256(text.encode('utf-8')).digest()
+        if digest in self.exact:
+            return self.exact[digest]
+        
+        signature = self.signature(text)
+        band_keys = self._band_keys(signature)
+        candidates = set()
+        for bucket, band_key in zip(self.buckets, band_keys):
+            candidates.update(bucket.get(band_key, ()))
+        
+        best_key, best_similarity = None, 0.0
+        for candidate in candidates:
+            similarity = float(np.mean(self.signatures[candidate] == signature))
+            if similarity > best_similarity:
+                best_key, best_similarity = candidate, similarity
+        if best_key is not None and best_similarity >= self.threshold:
+            self.exact[digest] = (best_key, best_similarity)
+            return best_key, best_similarity
+        
+        # A new representative
+        self.exact[digest] = (key, 1.0)
+        self.signatures[key] = signature
+        for bucket, band_key in zip(self.buckets, band_keys):
+            bucket.setdefault(band_key, []).append(key)
+        return key, 1.0
+
+def group_duplicates(texts, threshold=0.9, **kwargs):
+    """For each text, the index of its group's representative and the similarity to it"""
+    deduplicator = Deduplicator(threshold=threshold, **kwargs)
+    return [deduplicator.add(index, text) for index, text in enumerate(texts)]
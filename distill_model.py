@@ -0,0 +1,130 @@
+# distill_model.py
+"""
+Distill the NER model into a smaller, faster serving model
+Usage: python distill_model.py [--unlabeled extracted_resumes.json] [--output ./resume_ner_model_small]
+
+The student uses a narrower, shallower tok2vec and a smaller transition
+layer. It is trained on the gold training split plus "silver" examples:
+unlabeled resumes annotated by the current (teacher) model. Afterwards
+both models are scored and timed on the held-out split; load the
+student with ResumeParser('./resume_ner_model_small').
+"""
+
+import argparse
+import json
+import os
+import time
+import spacy
+from train_ner_model import load_training_data, train_ner_model, evaluate_dev
+from training_corpus import TrainingCorpus
+
+STUDENT_NER_CONFIG = {
+    'model': {
+        '@architectures': 'spacy.TransitionBasedParser.v2',
+        'state_type': 'ner',
+        'extra_state_tokens': False,
+        'hidden_width': 16,
+        'maxout_pieces': 1,
+        'use_upper': True,
+        'nO': None,
+        'tok2vec': {
+            '@architectures': 'spacy.HashEmbedCNN.v2',
+            'pretrained_vectors': None,
+            'width': 32,
+            'depth': 2,
+            'embed_size': 2000,
+            'window_size': 1,
+            'maxout_pieces': 2,
+            'subword_features': True,
+        },
+    },
+}
+
+def teacher_annotate(teacher, texts, batch_size=64):
+    """Label unlabeled texts with the teacher's predictions (silver data)"""
+    silver = []
+    for doc in teacher.pipe(texts, batch_size=batch_size):
+        entities = [[ent.start_char, ent.end_char, ent.label_] for ent in doc.ents]
+        silver.append([doc.text, {'entities': entities}])
+    return silver
+
+def load_unlabeled_texts(file_path, exclude=()):
+    """Texts from extracted_resumes.json, minus any in `exclude` (e.g. the held-out split)"""
+    if not file_path or not os.path.exists(file_path):
+        return []
+    with open(file_path, 'r', encoding='utf-8') as f:
+        records = json.load(f)
+    exclude = set(exclude)
+    return [record['text'] for record in records if record.get('text') and record['text'] not in exclude]
+
+def measure_speed(nlp, texts, repeats=5, batch_size=64):
+    """Throughput of nlp.pipe over `texts` repeated `repeats` times: (docs/s, tokens/s)"""
+    corpus = texts * repeats
+    n_tokens = 0
+    start = time.perf_counter()
+    for doc in nlp.pipe(corpus, batch_size=batch_size):
+        n_tokens += len(doc)
+    elapsed = time.perf_counter() - start
+    return len(corpus) / elapsed, n_tokens / elapsed
+
+def compare_models(model_paths, test_set, corpus_dir='./training_corpus', repeats=20):
+    """Accuracy-vs-speed report for each model on the held-out split"""
+    report = {}
+    for model_path in model_paths:
+        nlp = spacy.load(model_path)
+        corpus = TrainingCorpus(nlp, corpus_dir)
+        precision, recall, f1 = evaluate_dev(nlp, corpus, corpus.compile(test_set))
+        docs_per_sec, tokens_per_sec = measure_speed(nlp, [text for text, _ in test_set], repeats)
+        size = sum(os.path.getsize(os.path.join(root, name))
+                   for root, _, names in os.walk(model_path) for name in names)
+        report[model_path] = {'precision': precision, 'recall': recall, 'f1': f1,
+                              'docs_per_sec': docs_per_sec, 'tokens_per_sec': tokens_per_sec,
+                              'size_mb': size / 1e6}
+    
+    print("\n" + "="*80)
+    print("ACCURACY vs SPEED (held-out split)")
+    print("="*80)
+    print(f"  {'MODEL':32s} {'P':>6s} {'R':>6s} {'F1':>6s} {'DOCS/s':>8s} {'TOK/s':>9s} {'MB':>6s}")
+    for model_path, row in report.items():
+        print(f"  {model_path:32s} {row['precision'] * 100:6.1f} {row['recall'] * 100:6.1f} "
+              f"{row['f1'] * 100:6.1f} {row['docs_per_sec']:8.1f} {row['tokens_per_sec']:9.0f} "
+              f"{row['size_mb']:6.1f}")
+    
+    baseline, *others = report.values()
+    for model_path, row in zip(model_paths[1:], others):
+        print(f"\n  {model_path}: {row['tokens_per_sec'] / baseline['tokens_per_sec']:.2f}x throughput, "
+              f"{(row['f1'] - baseline['f1']) * 100:+.1f} F1 points")
+    return report
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Distill the resume NER model into a smaller one")
+    arg_parser.add_argument('--teacher', default='./resume_ner_model')
+    arg_parser.add_argument('--output', default='./resume_ner_model_small')
+    arg_parser.add_argument('--data', default='training_data.json')
+    arg_parser.add_argument('--unlabeled', default='extracted_resumes.json',
+                            help="extracted resumes to label with the teacher")
+    arg_parser.add_argument('--n-iter', type=int, default=50)
+    arg_parser.add_argument('--report', default='distillation_report.json')
+    args = arg_parser.parse_args()
+    
+    data = load_training_data(args.data)
+    split_point = int(len(data) * 0.8)
+    train_set, val_set = data[:split_point], data[split_point:]
+    
+    teacher = spacy.load(args.teacher)
+    unlabeled = load_unlabeled_texts(args.unlabeled, exclude=[text for text, _ in data])
+    silver = teacher_annotate(teacher, unlabeled)
+    print(f"Gold: {len(train_set)} examples, silver (teacher-labelled): {len(silver)} examples")
+    
+    # The student takes longer than the teacher to find any entities at all
+    train_ner_model(train_set + silver, n_iter=args.n_iter, output_dir=args.output,
+                    n_workers=os.cpu_count(), dev_data=val_set, min_epochs=25,
+                    checkpoint_dir='./distill_checkpoint', ner_config=STUDENT_NER_CONFIG)
+    
+    report = compare_models([args.teacher, args.output], val_set)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\n✅ Report saved to: {args.report}")
+
+if __name__ == "__main__":
+    main()
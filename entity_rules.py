@@ -0,0 +1,112 @@
+# entity_rules.py
+"""
+Pattern stage for structured resume fields
+EMAIL, PHONE, LINKEDIN, CGPA and DOB have regular shapes, so regexes
+over the raw text find them exactly for a fraction of the cost of the
+statistical model. Two pipeline components wrap them:
+
+    resume_entity_rules  (before "ner")  sets the rule matches as entities
+    resume_entity_merge  (after "ner")   applies the priority policy
+
+Priority policy:
+    1. A rule match always wins. It is set before the NER runs, and the
+       NER never predicts spans overlapping existing entities.
+    2. A model span with a structured label is kept only if the rules
+       found nothing with that label in the doc (a fallback for fields
+       too noisy for the patterns, e.g. a CGPA with no "CGPA" cue).
+    3. Model spans with any other label are kept as they are.
+"""
+
+import re
+from spacy.language import Language
+from spacy.util import filter_spans
+
+RULES_SPAN_KEY = 'entity_rules'
+
+MONTH = r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\.?'
+DATE = (rf'(?:\d{{1,2}}(?:st|nd|rd|th)?[ \-/.]*{MONTH}[ \-/.,]*\d{{4}}'
+        rf'|{MONTH} \d{{1,2}}(?:st|nd|rd|th)?,? \d{{4}}'
+        rf'|\d{{1,2}}[/.-]\d{{1,2}}[/.-]\d{{2,4}})')
+
+# Each pattern marks the entity with a `value` group; earlier patterns of
+# a label win over later ones where they overlap
+ENTITY_PATTERNS = {
+    'EMAIL': [
+        # PDF extraction splits some addresses: "kuruva sagar @gmail.com".
+        # Only trusted right after a field delimiter, not after a name.
+        r'(?<=[:|~•,;])[ \t]*(?P<value>[\w.%+-]+ [\w.%+-]+ ?@[\w-]+(?:\.[\w-]+)+)',
+        r'(?<![\w.%+-])(?P<value>[\w.%+-]+ ?@[\w-]+(?:\.[\w-]+)+)',
+    ],
+    'PHONE': [
+        r'(?<![\w+.])(?P<value>(?:\+ ?\d{1,3} ?-? ?)?\d(?:[ -]?\d){8,11})(?![\d.])',
+    ],
+    'LINKEDIN': [
+        r'(?P<value>(?:https?://)?(?:www\.)?linkedin(?:\.com)?/in/ ?[\w-]+(?: ?-[\w-]+)*/?)',
+    ],
+    'CGPA': [
+        r'(?i:\b(?:c?gpa|cpi)\b)\s*[:\-]?\s*(?P<value>\d{1,2}(?:\.\d{1,2})?)(?!\d)',
+        r'(?<![\d.])(?P<value>\d{1,2}\.\d{1,2})\s*(?:/\s*10\s*)?(?i:\b(?:c?gpa|cpi)\b)',
+    ],
+    'DOB': [
+        rf'(?i:\bd\.? ?o\.? ?b\.?|\bdate of birth|\bborn(?: on)?)\s*[:\-]?\s*(?P<value>{DATE})',
+    ],
+}
+
+COMPILED_PATTERNS = {label: [re.compile(pattern) for pattern in patterns]
+                     for label, patterns in ENTITY_PATTERNS.items()}
+
+STRUCTURED_LABELS = tuple(ENTITY_PATTERNS)
+
+def find_structured_entities(text):
+    """Rule matches in `text` as sorted, non-overlapping (start, end, label) spans"""
+    spans = []
+    for label, patterns in COMPILED_PATTERNS.items():
+        taken = []
+        for pattern in patterns:
+            for match in pattern.finditer(text):
+                start, end = match.span('value')
+                if not any(start < t_end and t_start < end for t_start, t_end in taken):
+                    taken.append((start, end))
+                    spans.append((start, end, label))
+    return sorted(spans)
+
+def clean_structured_value(label, value):
+    """Undo PDF word splits inside addresses ("kyotikhan @gmail.com")"""
+    if label in ('EMAIL', 'LINKEDIN'):
+        return ''.join(value.split())
+    return value
+
+@Language.factory('resume_entity_rules')
+def create_entity_rules(nlp, name):
+    return EntityRules()
+
+@Language.factory('resume_entity_merge')
+def create_entity_merge(nlp, name):
+    return EntityMerge()
+
+class EntityRules:
+    """Set regex matches for structured labels as entities, before the NER"""
+    
+    def __call__(self, doc):
+        spans = []
+        for start, end, label in find_structured_entities(doc.text):
+            span = doc.char_span(start, end, label=label, alignment_mode='expand')
+            if span is not None:
+                spans.append(span)
+        spans = filter_spans(spans)
+        doc.spans[RULES_SPAN_KEY] = spans
+        doc.set_ents(spans, default='unmodified')
+        return doc
+
+class EntityMerge:
+    """Drop model predictions of structured labels the rules already found"""
+    
+    def __call__(self, doc):
+        rule_spans = doc.spans.get(RULES_SPAN_KEY, [])
+        if not len(rule_spans):
+            return doc
+        rule_keys = {(span.start, span.end, span.label_) for span in rule_spans}
+        rule_labels = {label for _, _, label in rule_keys}
+        doc.ents = [ent for ent in doc.ents
+                    if ent.label_ not in rule_labels or (ent.start, ent.end, ent.label_) in rule_keys]
+        return doc
@@ -0,0 +1,216 @@
+# entity_table.py
+"""
+Columnar table of parsed entities, one row per entity
+Usage: python entity_table.py [parsed_entities.ents]
+
+Columns are doc_id, label, text, start and end (character offsets into
+the extracted text). Rows are written a row group at a time while
+parsing runs. Within a row group each column is its own zlib-compressed
+chunk, so a reader that needs only labels and texts never reads or
+decompresses the offsets. Labels are dictionary-encoded against one
+file-wide dictionary. Doc ids are dictionary-encoded per row group, and
+that dictionary also lists the documents that had no entities.
+
+Layout:
+    MAGIC, column chunks of each row group, footer (msgpack: labels and
+    each row group's column offsets), footer length (uint32 LE), MAGIC
+"""
+
+import json
+import os
+import struct
+import sys
+import zlib
+from collections import Counter
+import numpy as np
+import srsly
+
+MAGIC = b'RENT1'
+TABLE_SUFFIX = '.ents'
+COLUMNS = ('doc_id', 'label', 'text', 'start', 'end')
+ROW_GROUP_SIZE = 50000
+
+class EntityTableWriter:
+    """Buffer entity rows and write them out a row group at a time"""
+    
+    def __init__(self, path, row_group_size=ROW_GROUP_SIZE):
+        self.path = path
+        self.row_group_size = row_group_size
+        self.tmp_path = f"{path}.tmp{os.getpid()}"
+        self.file = open(self.tmp_path, 'wb')
+        self.file.write(MAGIC)
+        self.labels = {}  # label -> code
+        self.row_groups = []
+        self._clear()
+    
+    def _clear(self):
+        self.docs = []
+        self.columns = {name: [] for name in COLUMNS}
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        if exc_info[0] is None:
+            self.close()
+        else:
+            self.abort()
+    
+    def add(self, doc_id, entities):
+        """Append one document's (label, text, start, end) entities; a doc with none still counts"""
+        code = len(self.docs)
+        self.docs.append(doc_id)
+        columns = self.columns
+        for label, text, start, end in entities:
+            columns['doc_id'].append(code)
+            columns['label'].append(self.labels.setdefault(label, len(self.labels)))
+            columns['text'].append(text)
+            columns['start'].append(start)
+            columns['end'].append(end)
+        if len(columns['doc_id']) >= self.row_group_size:
+            self.flush_row_group()
+    
+    def flush_row_group(self):
+        """Write the buffered rows as one row group"""
+        if not self.docs:
+            return
+        columns = self.columns
+        encoded = {
+            'doc_id': srsly.msgpack_dumps([self.docs, np.asarray(columns['doc_id'], dtype='<u4').tobytes()]),
+            'label': np.asarray(columns['label'], dtype='<u2').tobytes(),
+            'text': srsly.msgpack_dumps(columns['text']),
+            'start': np.asarray(columns['start'], dtype='<u4').tobytes(),
+            'end': np.asarray(columns['end'], dtype='<u4').tobytes(),
+        }
+        chunks = {}
+        for name in COLUMNS:
+            data = zlib.compress(encoded[name], 6)
+            chunks[name] = [self.file.tell(), len(data)]
+            self.file.write(data)
+        self.row_groups.append({'n_rows': len(columns['doc_id']), 'n_docs': len(self.docs),
+                                'columns': chunks})
+        self._clear()
+    
+    def close(self):
+        """Write the last row group and the footer, then move the file into place"""
+        if self.file is None:
+            return
+        self.flush_row_group()
+        labels = sorted(self.labels, key=self.labels.get)
+        footer = srsly.msgpack_dumps({'columns': list(COLUMNS), 'labels': labels,
+                                      'row_groups': self.row_groups})
+        self.file.write(footer)
+        self.file.write(struct.pack('<I', len(footer)) + MAGIC)
+        self.file.close()
+        self.file = None
+        os.replace(self.tmp_path, self.path)
+    
+    def abort(self):
+        """Drop the partial file, leaving any existing table at `path` untouched"""
+        if self.file is None:
+            return
+        self.file.close()
+        self.file = None
+        os.remove(self.tmp_path)
+
+class EntityTable:
+    """Read selected columns of an entity table, one row group at a time"""
+    
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not an entity table")
+            f.seek(-(4 + len(MAGIC)), os.SEEK_END)
+            footer_size = struct.unpack('<I', f.read(4))[0]
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} has no footer (was it closed?)")
+            f.seek(-(4 + len(MAGIC) + footer_size), os.SEEK_END)
+            footer = srsly.msgpack_loads(f.read(footer_size))
+        self.labels = footer['labels']
+        self.row_groups = footer['row_groups']
+    
+    @property
+    def n_rows(self):
+        return sum(group['n_rows'] for group in self.row_groups)
+    
+    @property
+    def n_docs(self):
+        return sum(group['n_docs'] for group in self.row_groups)
+    
+    def _read_chunk(self, f, group, name):
+        offset, size = group['columns'][name]
+        f.seek(offset)
+        data = zlib.decompress(f.read(size))
+        if name == 'doc_id':
+            docs, codes = srsly.msgpack_loads(data)
+            return docs, np.frombuffer(codes, dtype='<u4')
+        if name == 'label':
+            return np.frombuffer(data, dtype='<u2')
+        if name == 'text':
+            return srsly.msgpack_loads(data)
+        return np.frombuffer(data, dtype='<u4')
+    
+    def iter_row_groups(self, columns=COLUMNS):
+        """Yield {column: values} per row group, reading only `columns`
+        
+        doc_id and label come back decoded (lists of strings); start and
+        end as numpy arrays.
+        """
+        with open(self.path, 'rb') as f:
+            for group in self.row_groups:
+                values = {}
+                for name in columns:
+                    chunk = self._read_chunk(f, group, name)
+                    if name == 'doc_id':
+                        docs, codes = chunk
+                        chunk = [docs[code] for code in codes]
+                    elif name == 'label':
+                        chunk = [self.labels[code] for code in chunk]
+                    values[name] = chunk
+                yield values
+    
+    def read(self, columns=COLUMNS):
+        """All rows of `columns`, as {column: list}"""
+        values = {name: [] for name in columns}
+        for group in self.iter_row_groups(columns):
+            for name in columns:
+                values[name].extend(group[name])
+        return values
+    
+    def grouped_entities(self):
+        """Results in parsed_resumes.json shape: [{'filename', 'entities': {label: unique values}}]
+        
+        Reads the doc_id, label and text columns only.
+        """
+        results = []
+        with open(self.path, 'rb') as f:
+            for group in self.row_groups:
+                docs, codes = self._read_chunk(f, group, 'doc_id')
+                labels = self._read_chunk(f, group, 'label')
+                texts = self._read_chunk(f, group, 'text')
+                entities = [{} for _ in docs]
+                for code, label, text in zip(codes, labels, texts):
+                    entities[code].setdefault(self.labels[label], set()).add(text)
+                for doc_id, doc_entities in zip(docs, entities):
+                    results.append({
+                        'filename': doc_id,
+                        'entities': {label: list(values) for label, values in doc_entities.items()}
+                    })
+        return results
+
+def load_parsed_results(parsed_file='parsed_resumes.json'):
+    """Parse results from parsed_resumes.json or an entity table, in the JSON file's shape"""
+    if parsed_file.endswith(TABLE_SUFFIX):
+        return EntityTable(parsed_file).grouped_entities()
+    with open(parsed_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+if __name__ == "__main__":
+    TABLE_PATH = sys.argv[1] if len(sys.argv) > 1 else 'parsed_entities' + TABLE_SUFFIX
+    
+    table = EntityTable(TABLE_PATH)
+    print(f"{TABLE_PATH}: {table.n_docs} docs, {table.n_rows} entities "
+          f"in {len(table.row_groups)} row group(s), {os.path.getsize(TABLE_PATH) / 1e6:.2f} MB")
+    for label, count in Counter(table.read(columns=['label'])['label']).most_common():
+        print(f"  {label}: {count}")
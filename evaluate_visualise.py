@@ -6,57 +6,140 @@ Usage: python evaluate_and_visualize.py
 
 import spacy
 import json
+import time
+from bisect import bisect_left, bisect_right
 from collections import Counter, defaultdict
-import matplotlib.pyplot as plt
+from training_corpus import TrainingCorpus, unannotated_doc
+from entity_table import load_parsed_results
+
+def _new_label_stats():
+    return {'tp': 0, 'fp': 0, 'fn': 0, 'boundary_errors': 0,
+            'label_errors': 0, 'partial_overlaps': 0}
+
+def score_spans(gold, predicted, stats):
+    """Accumulate span-level counts for one document into `stats`
+    
+    `gold` and `predicted` are sets of (start, end, label). Exact matches
+    come from a set intersection; the leftovers are then checked for
+    overlaps against the predictions sorted by offset (predicted spans
+    never overlap each other, so starts and ends sort together).
+    """
+    exact = gold & predicted
+    missed = gold - exact
+    spurious = predicted - exact
+    
+    for _, _, label in exact:
+        stats[label]['tp'] += 1
+    for _, _, label in missed:
+        stats[label]['fn'] += 1
+    for _, _, label in spurious:
+        stats[label]['fp'] += 1
+    
+    if not missed or not spurious:
+        return
+    
+    spurious = sorted(spurious)
+    starts = [span[0] for span in spurious]
+    ends = [span[1] for span in spurious]
+    
+    for start, end, label in missed:
+        # Predictions overlapping [start, end): end > start and begin < end
+        lo = bisect_right(ends, start)
+        hi = bisect_left(starts, end)
+        overlapping = spurious[lo:hi]
+        partial = False
+        for p_start, p_end, p_label in overlapping:
+            if (p_start, p_end) == (start, end):
+                stats[label]['label_errors'] += 1
+                continue
+            partial = True
+            if p_label == label:
+                stats[label]['boundary_errors'] += 1
+        if partial:
+            stats[label]['partial_overlaps'] += 1
+
+def precision_recall_f1(tp, fp, fn):
+    """Precision, recall and F1 from raw counts"""
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1
 
 class ModelEvaluator:
     def __init__(self, model_path='./resume_ner_model'):
         self.nlp = spacy.load(model_path)
     
-    def evaluate_on_test_set(self, test_data_path='training_data.json'):
-        """Evaluate model on test data"""
+    def evaluate_on_test_set(self, test_data_path='training_data.json', batch_size=64, n_process=1,
+                             corpus_dir='./training_corpus'):
+        """Evaluate model on test data
+        
+        Reports exact-match precision/recall/F1 per label, plus counts of
+        gold spans that a prediction only partially overlaps, and of those,
+        boundary errors (same label); label errors (same span, wrong
+        label) are counted separately.
+        Test docs are streamed pre-tokenized from the compiled corpus.
+        """
         with open(test_data_path, 'r', encoding='utf-8') as f:
             test_data = json.load(f)
         
         # Use last 20% as test set
-        test_set = test_data[int(len(test_data) * 0.8):]
+        corpus = TrainingCorpus(self.nlp, corpus_dir)
+        test_set = corpus.compile(test_data)[int(len(test_data) * 0.8):]
         
-        total_entities = 0
-        correct_entities = 0
-        entity_stats = defaultdict(lambda: {'total': 0, 'correct': 0})
+        # Every label the model knows is reported, even with no support
+        entity_stats = {label: _new_label_stats() for label in self.nlp.get_pipe('ner').labels}
+        entity_stats = defaultdict(_new_label_stats, entity_stats)
         
-        for text, annotations in test_set:
-            doc = self.nlp(text)
-            predicted = [(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents]
-            ground_truth = annotations['entities']
-            
-            for gt in ground_truth:
-                total_entities += 1
-                entity_stats[gt[2]]['total'] += 1
-                
-                if gt in predicted:
-                    correct_entities += 1
-                    entity_stats[gt[2]]['correct'] += 1
+        start_time = time.perf_counter()
+        references = corpus.iter_docs(test_set)
+        docs = self.nlp.pipe(((unannotated_doc(reference), reference.user_data['entities'])
+                              for reference in references),
+                             as_tuples=True, batch_size=batch_size, n_process=n_process)
+        
+        for doc, entities in docs:
+            predicted = {(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents}
+            ground_truth = {tuple(gt) for gt in entities}
+            score_spans(ground_truth, predicted, entity_stats)
         
-        accuracy = (correct_entities / total_entities * 100) if total_entities > 0 else 0
+        elapsed = time.perf_counter() - start_time
+        
+        totals = Counter()
+        for stats in entity_stats.values():
+            totals.update(stats)
+            stats['total'] = stats['tp'] + stats['fn']
+            stats['correct'] = stats['tp']
+            stats['precision'], stats['recall'], stats['f1'] = precision_recall_f1(
+                stats['tp'], stats['fp'], stats['fn'])
+        
+        precision, recall, f1 = precision_recall_f1(totals['tp'], totals['fp'], totals['fn'])
+        accuracy = recall * 100
         
         print("\n" + "="*80)
         print("MODEL EVALUATION RESULTS")
         print("="*80)
-        print(f"\nOverall Accuracy: {accuracy:.2f}%")
-        print(f"Correct: {correct_entities}/{total_entities}")
+        print(f"\nEvaluated {len(test_set)} documents in {elapsed:.2f}s")
+        print(f"\nOverall Precision: {precision * 100:.2f}%")
+        print(f"Overall Recall:    {recall * 100:.2f}%")
+        print(f"Overall F1:        {f1 * 100:.2f}%")
+        print(f"Correct: {totals['tp']}/{totals['tp'] + totals['fn']}")
+        print(f"Partial overlaps: {totals['partial_overlaps']} "
+              f"(boundary errors: {totals['boundary_errors']})")
+        print(f"Label errors (same span): {totals['label_errors']}")
         
         print("\nPer-Entity Performance:")
-        for entity_type, stats in entity_stats.items():
-            acc = (stats['correct'] / stats['total'] * 100) if stats['total'] > 0 else 0
-            print(f"  {entity_type}: {acc:.1f}% ({stats['correct']}/{stats['total']})")
+        print(f"  {'LABEL':15s} {'P':>6s} {'R':>6s} {'F1':>6s} {'TP':>5s} {'FP':>5s} {'FN':>5s} "
+              f"{'PART':>5s} {'BND':>5s} {'LBL':>5s}")
+        for entity_type in sorted(entity_stats):
+            stats = entity_stats[entity_type]
+            print(f"  {entity_type:15s} {stats['precision'] * 100:6.1f} {stats['recall'] * 100:6.1f} "
+                  f"{stats['f1'] * 100:6.1f} {stats['tp']:5d} {stats['fp']:5d} {stats['fn']:5d} "
+                  f"{stats['partial_overlaps']:5d} {stats['boundary_errors']:5d} {stats['label_errors']:5d}")
         
-        return accuracy, entity_stats
+        return accuracy, dict(entity_stats)
     
     def analyze_parsed_resumes(self, parsed_file='parsed_resumes.json'):
-        """Analyze statistics from parsed resumes"""
-        with open(parsed_file, 'r', encoding='utf-8') as f:
-            results = json.load(f)
+        """Analyze statistics from parsed resumes (JSON or a .ents entity table)"""
+        results = load_parsed_results(parsed_file)
         
         # Count entity types
         entity_counts = Counter()
@@ -101,6 +184,8 @@ class ModelEvaluator:
     
     def create_visualizations(self, entity_counts, top_skills, top_titles):
         """Create charts for presentation"""
+        import matplotlib.pyplot as plt  # only needed for charts, not evaluation
+        
         fig, axes = plt.subplots(2, 2, figsize=(15, 10))
         fig.suptitle('Resume NER Model - Analysis Dashboard', fontsize=16, fontweight='bold')
         
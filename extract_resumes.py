@@ -2,78 +2,304 @@
 """
 Extract text from PDF/DOCX/TXT resumes
 Usage: python extract_resumes.py
+
+Files are matched to extractors by content, so a misnamed or
+extensionless PDF is still picked up; see extractors.py. Subfolders and
+zip/tar archives are searched too, without unpacking; see ingest.py.
 """
 
+import io
 import os
-import PyPDF2
-import docx
+import time
+import hashlib
 import json
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from extractors import MAX_PAGES, MAX_CHARS, ExtractionError, extract_text
+from ingest import RESUME, ARCHIVE, classify, iter_archive, source_name, walk_files
+from instrumentation import metrics, configure_sinks_from_env
+from text_normalization import default_normalizer
 
-def extract_text_from_pdf(file_path):
-    """Extract text from PDF"""
-    try:
-        with open(file_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-            return text
-    except Exception as e:
-        print(f"Error reading PDF {file_path}: {e}")
-        return ""
+def extract_text_from_file(file_path, max_pages=MAX_PAGES, max_chars=MAX_CHARS):
+    """Extract text from a resume file with the extractors registered for its content"""
+    return extract_text_from_item(file_path, file_path, max_pages, max_chars)
+
+def extract_text_from_item(name, payload, max_pages=MAX_PAGES, max_chars=MAX_CHARS):
+    """Extract text from a (name, payload) item; the payload is a file path or the file's bytes
+    
+    Files on disk are handed to the extractors open, not read whole, so
+    backends only read the parts they need (e.g. a PDF's first pages).
+    """
+    if isinstance(payload, str):
+        with metrics.timer('file_read'):
+            stream = open(payload, 'rb')
+    else:
+        stream = io.BytesIO(payload)
+    with stream:
+        return extract_text(stream, name, max_pages, max_chars)
 
-def extract_text_from_docx(file_path):
-    """Extract text from DOCX"""
+def iter_extract_serial(items, max_pages=MAX_PAGES, max_chars=MAX_CHARS):
+    """Extract (name, payload) items one by one, yielding (name, text); failures yield empty text"""
+    for name, payload in items:
+        try:
+            yield name, extract_text_from_item(name, payload, max_pages, max_chars)
+        except Exception as e:
+            metrics.error('extract', name, e)
+            print(f"Error extracting {name}: {e}")
+            yield name, ""
+
+def _init_worker():
+    """Pool workers keep their own totals and never write to the parent's sinks"""
+    metrics.sinks = []
+    metrics.reset()
+
+def _extract_in_worker(name, payload, max_pages, max_chars):
+    """Extract one item in a pool worker, returning its metrics for the parent to merge"""
     try:
-        doc = docx.Document(file_path)
-        text = "\n".join([para.text for para in doc.paragraphs])
-        return text
-    except Exception as e:
-        print(f"Error reading DOCX {file_path}: {e}")
-        return ""
+        text, error = extract_text_from_item(name, payload, max_pages, max_chars), None
+    except ExtractionError as e:
+        text, error = "", e  # handed back so the backend stats still get merged
+    return text, error, metrics.snapshot_and_reset()
 
-def extract_text_from_txt(file_path):
-    """Extract text from TXT"""
+def _kill_pool(executor):
+    """Shut a process pool down, killing workers stuck on a file"""
+    for process in list(getattr(executor, '_processes', {}).values()):
+        process.kill()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+def iter_extract_parallel(items, n_workers=None, timeout=60, max_pending=None,
+                          max_pages=MAX_PAGES, max_chars=MAX_CHARS):
+    """Extract (name, payload) items in a process pool, yielding (name, text) as each finishes
+    
+    At most `max_pending` files are in flight at once, which also bounds
+    how many archive members are held in memory. A file that takes
+    longer than `timeout` seconds is abandoned: the pool is recycled so
+    the stuck worker cannot hold up the rest of the batch, and the other
+    in-flight files are resubmitted.
+    """
+    n_workers = n_workers or os.cpu_count() or 1
+    max_pending = max_pending or n_workers
+    items = iter(items)
+    retry = []
+    pending = {}
+    executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker)
+    
     try:
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as file:
-            return file.read()
-    except Exception as e:
-        print(f"Error reading TXT {file_path}: {e}")
-        return ""
+        while True:
+            # Keep the work queue topped up, but bounded
+            while len(pending) < max_pending:
+                item = retry.pop() if retry else next(items, None)
+                if item is None:
+                    break
+                future = executor.submit(_extract_in_worker, *item, max_pages, max_chars)
+                pending[future] = (item, time.monotonic() + timeout)
+            
+            if not pending:
+                break
+            
+            next_deadline = min(deadline for _, deadline in pending.values())
+            done, _ = wait(pending, timeout=max(0.0, next_deadline - time.monotonic()),
+                           return_when=FIRST_COMPLETED)
+            
+            for future in done:
+                (name, _), _ = pending.pop(future)
+                try:
+                    text, error, worker_metrics = future.result()
+                    metrics.merge(worker_metrics)
+                    if error is not None:
+                        raise error
+                    yield name, text
+                except Exception as e:
+                    metrics.error('extract', name, e)
+                    print(f"Error extracting {name}: {e}")
+                    yield name, ""
+            
+            now = time.monotonic()
+            expired = [f for f, (_, deadline) in pending.items() if deadline <= now and not f.done()]
+            if expired:
+                for future in expired:
+                    (name, _), _ = pending.pop(future)
+                    metrics.error('extract_timeout', name, f"timed out after {timeout}s")
+                    print(f"⏱  Timed out after {timeout}s: {name}")
+                    yield name, ""
+                
+                # Recycle the pool and resubmit whatever was still in flight
+                retry.extend(item for item, _ in pending.values())
+                pending.clear()
+                _kill_pool(executor)
+                executor = ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker)
+    finally:
+        _kill_pool(executor)
 
-def extract_all_resumes(resume_folder):
-    """Extract text from all resumes in a folder"""
-    extracted_data = []
+def hash_file(file_path, chunk_size=1 << 20):
+    """SHA-256 of a file's contents, read in chunks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def load_manifest(manifest_path):
+    """Load the extraction manifest, or an empty one if missing"""
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def plan_incremental(file_paths, manifest):
+    """Split files into (changed, unchanged) against the manifest
     
-    # Get all files
-    files = os.listdir(resume_folder)
-    print(f"Found {len(files)} files")
+    Size and mtime are checked first so unchanged files are not re-read;
+    only files whose stat differs are hashed. Returns the list of paths
+    to extract, the list of unchanged paths, and the updated manifest.
+    """
+    changed, unchanged = [], []
+    new_manifest = {}
     
-    for filename in files:
-        file_path = os.path.join(resume_folder, filename)
+    for file_path in file_paths:
+        stat = os.stat(file_path)
+        entry = {'size': stat.st_size, 'mtime': stat.st_mtime}
+        old = manifest.get(file_path)
         
-        if filename.endswith('.pdf'):
-            text = extract_text_from_pdf(file_path)
-        elif filename.endswith('.docx'):
-            text = extract_text_from_docx(file_path)
-        elif filename.endswith('.txt'):
-            text = extract_text_from_txt(file_path)
+        if old and old['size'] == entry['size'] and old['mtime'] == entry['mtime']:
+            entry['sha256'] = old['sha256']
+            unchanged.append(file_path)
         else:
-            continue
+            entry['sha256'] = hash_file(file_path)
+            if old and old['sha256'] == entry['sha256']:
+                unchanged.append(file_path)  # touched, but same content
+            else:
+                changed.append(file_path)
+        
+        new_manifest[file_path] = entry
+    
+    return changed, unchanged, new_manifest
+
+def _owning_file(name, names):
+    """The file on disk in `names` that a record name belongs to: itself, or an archive holding it"""
+    parts = name.split('/')
+    for end in range(1, len(parts) + 1):
+        owner = names.get('/'.join(parts[:end]))
+        if owner is not None:
+            return owner
+    return None
+
+def extract_all_resumes(resume_folder, n_workers=1, timeout=60,
+                        incremental=False, manifest_path='extraction_manifest.json',
+                        normalize=False, max_pages=MAX_PAGES, max_chars=MAX_CHARS):
+    """Extract text from all resumes in a folder, its subfolders and zip/tar archives
+    
+    With `n_workers` > 1 files are extracted in a process pool and
+    written out in completion order. With `incremental=True` only files
+    that are new or changed since the last run (per the manifest) are
+    extracted; unchanged ones are carried over from the previous
+    extracted_resumes.json and deleted ones are dropped. With
+    `normalize=True` the saved text has extraction noise (whitespace
+    padding, split words, icon names) removed. Text is cut after
+    `max_pages` PDF pages or `max_chars` characters (None for no limit).
+    
+    Records are named by their path relative to the folder; archive
+    members are named under the archive's path (see ingest.py).
+    """
+    extracted_data = []
+    normalizer = default_normalizer() if normalize else None
+    
+    # Every file under the folder at any depth; archives count as one file here
+    kinds = {}
+    for file_path in walk_files(resume_folder):
+        with open(file_path, 'rb') as stream:
+            kinds[file_path] = classify(stream, file_path)
+    file_paths = [file_path for file_path, kind in kinds.items() if kind]
+    n_archives = sum(kind == ARCHIVE for kind in kinds.values())
+    print(f"Found {len(kinds)} files: {len(file_paths) - n_archives} resumes, "
+          f"{n_archives} archives")
+    
+    if incremental:
+        manifest = load_manifest(manifest_path)
+        file_paths, unchanged, manifest = plan_incremental(file_paths, manifest)
+        
+        previous = {}
+        if os.path.exists('extracted_resumes.json'):
+            with open('extracted_resumes.json', 'r', encoding='utf-8') as f:
+                previous = {r['filename']: r for r in json.load(f)}
+        
+        # An unchanged archive carries over the records of all its members
+        names = {source_name(file_path, resume_folder): file_path for file_path in unchanged}
+        carried = {}
+        for name, record in previous.items():
+            owner = _owning_file(name, names)
+            if owner is not None:
+                carried.setdefault(owner, []).append(record)
+        
+        for file_path in unchanged:
+            records = carried.get(file_path)
+            if not records:
+                file_paths.append(file_path)  # no prior output to reuse
+            else:
+                extracted_data.extend(records)
+        
+        print(f"Incremental: {len(file_paths)} new/changed, "
+              f"{len(extracted_data)} unchanged")
+    
+    counts = {RESUME: 0, ARCHIVE: 0}
+    
+    def iter_items():
+        for file_path in file_paths:
+            name = source_name(file_path, resume_folder)
+            if kinds[file_path] == ARCHIVE:
+                with open(file_path, 'rb') as stream:
+                    for item in iter_archive(stream, name):
+                        counts[ARCHIVE] += 1
+                        yield item
+            else:
+                counts[RESUME] += 1
+                yield name, file_path
+    
+    if n_workers > 1:
+        extracted = iter_extract_parallel(iter_items(), n_workers=n_workers, timeout=timeout,
+                                          max_pages=max_pages, max_chars=max_chars)
+    else:
+        extracted = iter_extract_serial(iter_items(), max_pages=max_pages, max_chars=max_chars)
+    
+    # JSONL copy is written as we go, for the streaming parser
+    jsonl_file = open('extracted_resumes.jsonl', 'w', encoding='utf-8')
+    for record in extracted_data:
+        jsonl_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+    
+    for filename, text in extracted:
+        
+        if normalizer is not None:
+            with metrics.timer('normalization'):
+                text = normalizer.clean(text)
         
         if text.strip():
-            extracted_data.append({
+            record = {
                 'filename': filename,
                 'text': text
-            })
+            }
+            extracted_data.append(record)
+            with metrics.timer('serialization'):
+                jsonl_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            metrics.count('files_extracted')
+            metrics.count('chars_extracted', len(text))
             print(f"✓ Extracted: {filename}")
+        else:
+            metrics.count('files_empty')
+    
+    jsonl_file.close()
     
     # Save extracted texts
-    with open('extracted_resumes.json', 'w', encoding='utf-8') as f:
-        json.dump(extracted_data, f, indent=2, ensure_ascii=False)
+    with metrics.timer('serialization'):
+        with open('extracted_resumes.json', 'w', encoding='utf-8') as f:
+            json.dump(extracted_data, f, indent=2, ensure_ascii=False)
+    
+    if incremental:
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2)
     
-    print(f"\n✅ Extracted {len(extracted_data)} resumes")
-    print("Saved to: extracted_resumes.json")
+    print(f"\nRead {counts[RESUME] + counts[ARCHIVE]} resume files "
+          f"({counts[RESUME]} on disk, {counts[ARCHIVE]} inside archives)")
+    print(f"✅ Extracted {len(extracted_data)} resumes")
+    print("Saved to: extracted_resumes.json (and extracted_resumes.jsonl)")
     
     return extracted_data
 
@@ -85,4 +311,6 @@ if __name__ == "__main__":
         print(f"❌ Folder not found: {RESUME_FOLDER}")
         print("Please create a 'resumes' folder and add your resume files")
     else:
-        extract_all_resumes(RESUME_FOLDER)
\ No newline at end of file
+        configure_sinks_from_env()
+        extract_all_resumes(RESUME_FOLDER, n_workers=os.cpu_count() or 1, incremental=True)
+        metrics.report()
\ No newline at end of file
@@ -0,0 +1,193 @@
+# extractors.py
+"""
+Registry of text extractors for resume files
+Files are recognised by their leading bytes, not their extension, and
+each content type has a chain of backends tried in order:
+
+    PDF   pymupdf (fast, optional)  ->  pypdf2
+    DOCX  python_docx (body, tables, headers and footers)
+    TXT   plain_text
+
+A backend whose library is not installed is skipped; one that raises is
+recorded and the next one is tried. The whole chain is timed as the
+`text_extraction` stage, each backend's share of it as the breakdown
+stage `text_extraction.<name>`, and its outcomes go to the
+`extract_<name>_ok` and `extract_<name>_errors` counters. Add a backend or content type with
+@register_extractor(mime, name) on a generator of text pieces.
+"""
+
+import codecs
+import zipfile
+from instrumentation import metrics
+
+PDF_MIME = 'application/pdf'
+DOCX_MIME = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+TEXT_MIME = 'text/plain'
+
+# Plain text has no signature, so it is still recognised by extension
+TEXT_EXTENSIONS = ('.txt',)
+
+# Resume entities sit in the first pages; long portfolio PDFs are cut here
+MAX_PAGES = 10
+MAX_CHARS = 50000
+
+# mime -> [(backend name, generator function)], in the order they are tried
+EXTRACTORS = {}
+
+class ExtractionError(Exception):
+    """A file could not be turned into text"""
+
+class UnsupportedFormat(ExtractionError):
+    """No extractor is registered for a file's content"""
+
+def register_extractor(mime, name):
+    """Add `func(stream, max_pages)`, yielding text pieces, as the next backend for `mime`"""
+    def decorator(func):
+        EXTRACTORS.setdefault(mime, []).append((name, func))
+        return func
+    return decorator
+
+def sniff_mime(stream, name=''):
+    """Content type of a seekable binary stream from its leading bytes, or None"""
+    head = stream.read(2048)
+    stream.seek(0)
+    if head.startswith(b'PK\x03\x04'):
+        try:
+            with zipfile.ZipFile(stream) as archive:
+                names = set(archive.namelist())
+        except zipfile.BadZipFile:
+            return None
+        finally:
+            stream.seek(0)
+        return DOCX_MIME if 'word/document.xml' in names else None
+    # Readers accept a little text before the header, but an archive
+    # holding a PDF also has "%PDF-" near its start, after binary bytes
+    offset = head.find(b'%PDF-', 0, 1024)
+    if offset == 0 or (offset > 0 and head[:offset].isascii() and b'\x00' not in head[:offset]):
+        return PDF_MIME
+    if name.lower().endswith(TEXT_EXTENSIONS):
+        if head.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)) or b'\x00' not in head:
+            return TEXT_MIME
+    return None
+
+def extract_text(stream, source, max_pages=MAX_PAGES, max_chars=MAX_CHARS):
+    """Text of a resume stream from the first backend for its type that succeeds
+    
+    Stops after `max_pages` pages (PDF) or `max_chars` characters; either
+    can be None for no limit. `source` names the file in error reports.
+    Raises UnsupportedFormat for unrecognised content and ExtractionError
+    when every backend fails.
+    """
+    mime = sniff_mime(stream, source)
+    if mime not in EXTRACTORS:
+        raise UnsupportedFormat(f"unrecognised file content: {source}")
+    
+    with metrics.timer('text_extraction'):
+        failures = []
+        for name, backend in EXTRACTORS[mime]:
+            stream.seek(0)
+            pieces = backend(stream, max_pages)
+            try:
+                with metrics.timer(f'text_extraction.{name}'):
+                    text = _join_within_budget(pieces, max_chars)
+            except ImportError:
+                continue  # optional backend not installed
+            except Exception as e:
+                metrics.error(f'extract_{name}', source, e)
+                failures.append(f"{name}: {e}")
+                continue
+            finally:
+                pieces.close()
+            metrics.count(f'extract_{name}_ok')
+            return text
+    
+    raise ExtractionError(f"all extractors failed for {source}: " + "; ".join(failures)
+                          if failures else f"no extractor installed for {mime}")
+
+def _join_within_budget(pieces, max_chars):
+    """Join text pieces once, stopping as soon as `max_chars` is reached"""
+    parts = []
+    n_chars = 0
+    for piece in pieces:
+        parts.append(piece)
+        n_chars += len(piece)
+        if max_chars is not None and n_chars >= max_chars:
+            if n_chars > max_chars:
+                metrics.count('text_truncated')
+            break
+    text = "".join(parts)
+    return text if max_chars is None else text[:max_chars]
+
+def _page_range(n_pages, max_pages):
+    """Pages to decode under the page budget"""
+    if max_pages is not None and n_pages > max_pages:
+        metrics.count('pdf_truncated')
+        n_pages = max_pages
+    metrics.count('pdf_pages', n_pages)
+    return range(n_pages)
+
+@register_extractor(PDF_MIME, 'pymupdf')
+def pymupdf_pages(stream, max_pages):
+    """PDF page texts via PyMuPDF, which decodes pages faster than PyPDF2"""
+    import pymupdf  # optional
+    # Files on disk are opened by path so PyMuPDF reads only what it needs
+    path = getattr(stream, 'name', None)
+    document = (pymupdf.open(path, filetype='pdf') if isinstance(path, str)
+                else pymupdf.open(stream=stream, filetype='pdf'))
+    with document:
+        for index in _page_range(document.page_count, max_pages):
+            yield document[index].get_text()
+
+@register_extractor(PDF_MIME, 'pypdf2')
+def pypdf2_pages(stream, max_pages):
+    """PDF page texts via PyPDF2, decoded only as the generator is advanced"""
+    import PyPDF2
+    pages = PyPDF2.PdfReader(stream).pages
+    for index in _page_range(len(pages), max_pages):
+        yield pages[index].extract_text() or ""
+
+@register_extractor(DOCX_MIME, 'python_docx')
+def docx_text(stream, max_pages):
+    """DOCX text: headers, then the body in document order, then footers"""
+    import docx
+    document = docx.Document(stream)
+    headers, footers = [], []
+    for section in document.sections:
+        parts = [(section.header, headers), (section.footer, footers)]
+        if section.different_first_page_header_footer:
+            # Contact details often live only in the first-page header
+            parts += [(section.first_page_header, headers), (section.first_page_footer, footers)]
+        for part, lines in parts:
+            if not part.is_linked_to_previous:
+                lines.extend(_docx_lines(part))
+    yield "\n".join(headers + list(_docx_lines(document)) + footers)
+
+def _docx_lines(container):
+    """Lines of the paragraphs and tables in a DOCX body, header, footer or table cell"""
+    from docx.table import Table
+    for block in container.iter_inner_content():
+        if not isinstance(block, Table):
+            yield block.text
+            continue
+        for row in block.rows:
+            cells = []
+            for cell in row.cells:
+                if cell._tc not in (seen._tc for seen in cells):  # merged cells repeat
+                    cells.append(cell)
+            cell_lines = [[line for line in _docx_lines(cell) if line.strip()] for cell in cells]
+            if all(len(lines) <= 1 for lines in cell_lines):
+                # A row of values ("B.Tech | XYZ University | 8.5")
+                yield " | ".join(lines[0] for lines in cell_lines if lines)
+            else:
+                # A layout table: keep each cell's text together
+                for lines in cell_lines:
+                    yield from lines
+
+@register_extractor(TEXT_MIME, 'plain_text')
+def plain_text(stream, max_pages):
+    """Decoded text file, UTF-16 if it has a byte-order mark, else UTF-8"""
+    data = stream.read()
+    if data.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        yield data.decode('utf-16', errors='ignore')
+    else:
+        yield data.decode('utf-8-sig', errors='ignore')
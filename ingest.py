@@ -0,0 +1,106 @@
+# ingest.py
+"""
+Find resume files in a directory tree and inside zip/tar archives
+Archives are read in place: each member is pulled into memory, one at a
+time, and handed to the extractors as bytes, with nothing unpacked to
+disk. Archives nested in archives are opened the same way. A file's
+name is its path relative to the resume folder, and a member's name is
+the archive's name plus the member path ("drop/batch.zip/cv.pdf").
+"""
+
+import io
+import os
+import tarfile
+import zipfile
+from extractors import EXTRACTORS, sniff_mime
+from instrumentation import metrics
+
+RESUME = 'resume'
+ARCHIVE = 'archive'
+
+COMPRESSED_MAGIC = (b'\x1f\x8b', b'BZh', b'\xfd7zXZ\x00')
+
+# Members bigger than this are skipped rather than read into memory
+MAX_MEMBER_BYTES = 64 << 20
+
+def classify(stream, name):
+    """RESUME if an extractor handles the stream, ARCHIVE for zip/tar, else None"""
+    if sniff_mime(stream, name) in EXTRACTORS:
+        return RESUME
+    try:
+        if zipfile.is_zipfile(stream) or _is_tar(stream):
+            return ARCHIVE
+    finally:
+        stream.seek(0)
+    return None
+
+def _is_tar(stream):
+    """Whether a stream is a tar archive, plain or gzip/bzip2/xz compressed"""
+    stream.seek(0)
+    head = stream.read(512)
+    stream.seek(0)
+    if head[257:262] == b'ustar':
+        return True
+    # tarfile takes any short stream for an empty archive, so only
+    # compressed streams are opened to look inside
+    return head.startswith(COMPRESSED_MAGIC) and tarfile.is_tarfile(stream)
+
+def walk_files(root):
+    """Every regular file under `root`, at any depth, in a stable order"""
+    for dir_path, dir_names, file_names in os.walk(root):
+        dir_names.sort()
+        for file_name in sorted(file_names):
+            file_path = os.path.join(dir_path, file_name)
+            if os.path.isfile(file_path):
+                yield file_path
+
+def source_name(file_path, root):
+    """Name a file on disk by its path relative to the resume folder"""
+    return os.path.relpath(file_path, root).replace(os.sep, '/')
+
+def iter_archive(stream, name, max_member_bytes=MAX_MEMBER_BYTES):
+    """Yield (name, bytes) for every resume file inside a zip or tar stream
+    
+    A corrupt archive is reported and skipped from the point it breaks,
+    after yielding whatever members could be read.
+    """
+    try:
+        if zipfile.is_zipfile(stream):
+            stream.seek(0)
+            with zipfile.ZipFile(stream) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir():
+                        member_name = f"{name}/{info.filename}"
+                        if _fits(member_name, info.file_size, max_member_bytes):
+                            yield from _expand_member(member_name, archive.read(info), max_member_bytes)
+        else:
+            stream.seek(0)
+            # Members are read in archive order, so compressed tars stream through once
+            with tarfile.open(fileobj=stream, mode='r:*') as archive:
+                for member in archive:
+                    if member.isfile():
+                        member_name = f"{name}/{member.name}"
+                        if _fits(member_name, member.size, max_member_bytes):
+                            data = archive.extractfile(member).read()
+                            yield from _expand_member(member_name, data, max_member_bytes)
+    except Exception as e:
+        metrics.error('archive', name, e)
+        print(f"Error reading archive {name}: {e}")
+
+def _fits(name, size, max_member_bytes):
+    """Whether an archive member is small enough to read into memory"""
+    if max_member_bytes is not None and size > max_member_bytes:
+        metrics.count('archive_members_skipped')
+        print(f"⚠️  Skipping {name}: {size} bytes")
+        return False
+    return True
+
+def _expand_member(name, data, max_member_bytes):
+    """Yield an archive member if it is a resume, or the resumes inside it if it is an archive"""
+    stream = io.BytesIO(data)
+    kind = classify(stream, name)
+    if kind == RESUME:
+        metrics.count('archive_members')
+        yield name, data
+    elif kind == ARCHIVE:
+        yield from iter_archive(stream, name, max_member_bytes)
@@ -0,0 +1,246 @@
+# instrumentation.py
+"""
+Lightweight per-stage timing and counters for the resume pipeline
+Stages (file read, text extraction, tokenization, NER inference,
+serialization) record wall and CPU time into a shared `metrics`
+object; sinks decide where the numbers go. A stage named
+"<parent>.<part>" is a breakdown of time already counted in <parent>.
+
+Enable sinks from the environment in any script, e.g.:
+    RESUME_METRICS_LOG=1 RESUME_METRICS_JSONL=metrics.jsonl python resume_parser.py
+    RESUME_METRICS_PROM=/var/lib/node_exporter/resume.prom python extract_resumes.py
+"""
+
+import json
+import logging
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+logger = logging.getLogger('resume_pipeline')
+
+class LogSink:
+    """Log errors as they happen and the stage summary on flush"""
+    
+    def __init__(self, log=None, level=logging.INFO):
+        self.log = log or logger
+        self.level = level
+    
+    def on_timing(self, stage, wall, cpu):
+        pass
+    
+    def on_count(self, name, value):
+        pass
+    
+    def on_error(self, stage, source, error):
+        self.log.warning("%s failed for %s: %s", stage, source, error)
+    
+    def flush(self, summary):
+        """Log one line per stage and counter"""
+        for stage, stats in summary['stages'].items():
+            self.log.log(self.level, "%s: %d calls, wall %.3fs, cpu %.3fs",
+                         stage, stats['calls'], stats['wall'], stats['cpu'])
+        for name, value in summary['counters'].items():
+            self.log.log(self.level, "%s: %d", name, value)
+
+class JsonLinesSink:
+    """Append every timing, counter and error event to a JSON lines file"""
+    
+    def __init__(self, path, flush_every=100):
+        self.file = open(path, 'a', encoding='utf-8')
+        self.flush_every = flush_every
+        self._pending = 0
+    
+    def _write(self, event):
+        event['ts'] = time.time()
+        self.file.write(json.dumps(event, ensure_ascii=False) + "\n")
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.file.flush()
+            self._pending = 0
+    
+    def on_timing(self, stage, wall, cpu):
+        self._write({'event': 'timing', 'stage': stage, 'wall': wall, 'cpu': cpu})
+    
+    def on_count(self, name, value):
+        self._write({'event': 'count', 'name': name, 'value': value})
+    
+    def on_error(self, stage, source, error):
+        self._write({'event': 'error', 'stage': stage, 'source': str(source), 'error': str(error)})
+    
+    def flush(self, summary):
+        self._write({'event': 'summary', **summary})
+        self.file.flush()
+
+class PrometheusTextfileSink:
+    """Write totals in Prometheus text format (for node_exporter's textfile collector)"""
+    
+    def __init__(self, path, prefix='resume_pipeline'):
+        self.path = path
+        self.prefix = prefix
+    
+    def on_timing(self, stage, wall, cpu):
+        pass
+    
+    def on_count(self, name, value):
+        pass
+    
+    def on_error(self, stage, source, error):
+        pass
+    
+    def flush(self, summary):
+        """Rewrite the textfile with current totals"""
+        p = self.prefix
+        lines = []
+        stages = sorted(summary['stages'].items())
+        for family, key in (('stage_wall_seconds_total', 'wall'),
+                            ('stage_cpu_seconds_total', 'cpu'),
+                            ('stage_calls_total', 'calls')):
+            lines.append(f"# TYPE {p}_{family} counter")
+            for stage, stats in stages:
+                lines.append(f'{p}_{family}{{stage="{stage}"}} {stats[key]}')
+        for name, value in sorted(summary['counters'].items()):
+            lines.append(f"# TYPE {p}_{name}_total counter")
+            lines.append(f"{p}_{name}_total {value}")
+        
+        # Write-then-rename so the collector never reads a half-written file
+        tmp_path = f"{self.path}.tmp{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.path)
+
+class Instrumentation:
+    """Aggregates stage timings and counters, forwarding events to sinks"""
+    
+    def __init__(self, sinks=None):
+        self.sinks = list(sinks or [])
+        self.reset()
+    
+    def reset(self):
+        """Clear all totals"""
+        self.stages = defaultdict(lambda: {'calls': 0, 'wall': 0.0, 'cpu': 0.0})
+        self.counters = defaultdict(int)
+    
+    def add_sink(self, sink):
+        """Send future events (and flushes) to `sink`"""
+        self.sinks.append(sink)
+    
+    @contextmanager
+    def timer(self, stage):
+        """Time a block as one call of `stage`"""
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - wall_start, time.process_time() - cpu_start)
+    
+    def timed_iter(self, iterable, stage):
+        """Yield from `iterable`, charging the time spent producing each item to `stage`"""
+        iterator = iter(iterable)
+        while True:
+            wall_start = time.perf_counter()
+            cpu_start = time.process_time()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            self.record(stage, time.perf_counter() - wall_start, time.process_time() - cpu_start)
+            yield item
+    
+    def record(self, stage, wall, cpu, calls=1):
+        """Add measured wall/CPU seconds to `stage`"""
+        stats = self.stages[stage]
+        stats['calls'] += calls
+        stats['wall'] += wall
+        stats['cpu'] += cpu
+        for sink in self.sinks:
+            sink.on_timing(stage, wall, cpu)
+    
+    def count(self, name, value=1):
+        """Increment counter `name`"""
+        self.counters[name] += value
+        for sink in self.sinks:
+            sink.on_count(name, value)
+    
+    def error(self, stage, source, error):
+        """Count a per-file failure that the caller is otherwise swallowing"""
+        self.counters[f"{stage}_errors"] += 1
+        for sink in self.sinks:
+            sink.on_error(stage, source, error)
+    
+    def summary(self):
+        """Current totals as plain dicts"""
+        return {
+            'stages': {stage: dict(stats) for stage, stats in self.stages.items()},
+            'counters': dict(self.counters),
+        }
+    
+    def snapshot_and_reset(self):
+        """Hand accumulated totals to another process (see merge)"""
+        summary = self.summary()
+        self.reset()
+        return summary
+    
+    def merge(self, summary):
+        """Fold in totals collected in a worker process"""
+        for stage, stats in summary['stages'].items():
+            mine = self.stages[stage]
+            for key in ('calls', 'wall', 'cpu'):
+                mine[key] += stats[key]
+        for name, value in summary['counters'].items():
+            self.counters[name] += value
+    
+    def flush(self):
+        """Push current totals to every sink"""
+        summary = self.summary()
+        for sink in self.sinks:
+            sink.flush(summary)
+        return summary
+    
+    def report(self):
+        """Print a per-stage table, slowest stage first, and flush sinks"""
+        summary = self.flush()
+        if not summary['stages'] and not summary['counters']:
+            return summary
+        
+        stages = summary['stages']
+        # Breakdown stages ("parent.part") are timed inside their parent, so
+        # they are listed under it and left out of the total
+        top_level = {stage: stats for stage, stats in stages.items()
+                     if '.' not in stage or stage.partition('.')[0] not in stages}
+        total_wall = sum(stats['wall'] for stats in top_level.values()) or 1.0
+        print("\n" + "="*80)
+        print("PIPELINE TIMINGS")
+        print("="*80)
+        print(f"  {'STAGE':28s} {'CALLS':>8s} {'WALL s':>10s} {'CPU s':>10s} {'SHARE':>7s}")
+        ranked = sorted(top_level.items(), key=lambda item: item[1]['wall'], reverse=True)
+        for stage, stats in ranked:
+            print(f"  {stage:28s} {stats['calls']:8d} {stats['wall']:10.3f} {stats['cpu']:10.3f} "
+                  f"{stats['wall'] / total_wall:7.1%}")
+            parts = [(name, part) for name, part in stages.items()
+                     if name not in top_level and name.partition('.')[0] == stage]
+            for name, part in sorted(parts, key=lambda item: item[1]['wall'], reverse=True):
+                print(f"    {name:26s} {part['calls']:8d} {part['wall']:10.3f} {part['cpu']:10.3f} "
+                      f"{part['wall'] / total_wall:7.1%}")
+        if ranked:
+            print(f"\n  Bottleneck: {ranked[0][0]}")
+        for name, value in sorted(summary['counters'].items()):
+            print(f"  {name}: {value}")
+        return summary
+
+def configure_sinks_from_env(instrumentation=None):
+    """Attach sinks named by RESUME_METRICS_LOG / _JSONL / _PROM environment variables"""
+    instrumentation = instrumentation or metrics
+    if os.environ.get('RESUME_METRICS_LOG'):
+        logging.basicConfig(level=logging.INFO)
+        instrumentation.add_sink(LogSink())
+    if os.environ.get('RESUME_METRICS_JSONL'):
+        instrumentation.add_sink(JsonLinesSink(os.environ['RESUME_METRICS_JSONL']))
+    if os.environ.get('RESUME_METRICS_PROM'):
+        instrumentation.add_sink(PrometheusTextfileSink(os.environ['RESUME_METRICS_PROM']))
+    return instrumentation
+
+# Shared instance used throughout the pipeline
+metrics = Instrumentation()
@@ -0,0 +1,89 @@
+# model_pack.py
+"""
+Pack a trained spaCy pipeline into one binary file for fast loading
+Usage: python model_pack.py [model_dir] [output_file]
+
+spacy.load() on a model directory builds the default tokenizer from
+its config and then replaces it with the serialized one, reading a
+dozen small files on the way. A pack holds the config and the full
+nlp.to_bytes() payload in a single msgpack file, and loading it skips
+the throwaway tokenizer build.
+"""
+
+import os
+import sys
+import time
+import srsly
+import spacy
+from spacy.tokenizer import Tokenizer
+from spacy.util import load_model_from_config
+from thinc.api import Config
+from parse_cache import model_version
+
+PACK_SUFFIX = '.pack'
+
+@spacy.registry.tokenizers("resume_parser.PackedTokenizer.v1")
+def create_packed_tokenizer():
+    """Empty placeholder tokenizer; the real one is restored from the pack bytes"""
+    def create_tokenizer(nlp):
+        return Tokenizer(nlp.vocab)
+    return create_tokenizer
+
+def pack_model(model_path='./resume_ner_model', output_file=None):
+    """Serialize a model directory into a single .pack file"""
+    output_file = output_file or model_path.rstrip('/\\') + PACK_SUFFIX
+    nlp = spacy.load(model_path)
+    payload = {
+        'config': nlp.config.to_str(),
+        'model_version': model_version(model_path),
+        'nlp': nlp.to_bytes(),
+    }
+
+    tmp_path = f"{output_file}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        f.write(srsly.msgpack_dumps(payload))
+    os.replace(tmp_path, output_file)
+    print(f"✅ Packed {model_path} -> {output_file}")
+    return output_file
+
+def load_packed_model(pack_file):
+    """Load a pipeline from a .pack file; returns (nlp, model_version)"""
+    with open(pack_file, 'rb') as f:
+        payload = srsly.msgpack_loads(f.read())
+
+    config = Config().from_str(payload['config'])
+    tokenizer_config = dict(config['nlp']['tokenizer'])
+    config['nlp']['tokenizer'] = {'@tokenizers': 'resume_parser.PackedTokenizer.v1'}
+
+    nlp = load_model_from_config(config, auto_fill=False)
+    nlp.from_bytes(payload['nlp'])
+    # Keep the original tokenizer in the config so nlp.to_disk() stays portable
+    nlp._config['nlp']['tokenizer'] = tokenizer_config
+    return nlp, payload['model_version']
+
+def is_pack_fresh(pack_file, model_path):
+    """True if `pack_file` exists and is newer than the model's weights and meta"""
+    if not os.path.exists(pack_file):
+        return False
+    pack_mtime = os.path.getmtime(pack_file)
+    for name in ('meta.json', os.path.join('ner', 'model')):
+        source = os.path.join(model_path, name)
+        if os.path.exists(source) and os.path.getmtime(source) > pack_mtime:
+            return False
+    return True
+
+if __name__ == "__main__":
+    MODEL_PATH = sys.argv[1] if len(sys.argv) > 1 else './resume_ner_model'
+    OUTPUT_FILE = sys.argv[2] if len(sys.argv) > 2 else None
+
+    pack_file = pack_model(MODEL_PATH, OUTPUT_FILE)
+
+    start = time.perf_counter()
+    spacy.load(MODEL_PATH)
+    dir_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    load_packed_model(pack_file)
+    pack_time = time.perf_counter() - start
+
+    print(f"spacy.load(dir): {dir_time:.3f}s, packed load: {pack_time:.3f}s")
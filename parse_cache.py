@@ -0,0 +1,149 @@
+# parse_cache.py
+"""
+Content-addressed cache for parse results
+Used by ResumeParser so repeat submissions of the same resume text
+cost a lookup instead of a model forward pass.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+def model_version(model_path='./resume_ner_model'):
+    """Fingerprint a trained model from meta.json plus its NER weights"""
+    with open(os.path.join(model_path, 'meta.json'), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    
+    digest = hashlib.sha256()
+    weights_path = os.path.join(model_path, 'ner', 'model')
+    if os.path.exists(weights_path):
+        with open(weights_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    
+    return f"{meta.get('name', 'model')}-{meta.get('version', '0')}-{digest.hexdigest()[:12]}"
+
+class ParseCache:
+    """Two-tier (in-memory LRU + SQLite) cache keyed by text hash and model version
+    
+    `variant` names parser options that change the output (e.g.
+    "normalize+rules"). It is folded into the key, so configurations can
+    share one database; only a new model fingerprint clears old entries.
+    """
+    
+    def __init__(self, model_version, db_path='parse_cache.db', variant='',
+                 memory_size=10000, max_disk_entries=1000000, commit_every=100):
+        self.model_version = model_version
+        self.variant = variant
+        self.memory_size = memory_size
+        self.max_disk_entries = max_disk_entries
+        self.commit_every = commit_every
+        self.memory = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._pending_writes = 0
+        
+        self.db = None
+        if db_path:
+            # Callers may hand parsing to a worker thread (see parse_service.py)
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS parse_cache ("
+                "key TEXT PRIMARY KEY, model_version TEXT, result TEXT, last_used REAL)"
+            )
+            self.db.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON parse_cache (last_used)")
+            # A different model makes every older entry stale
+            self.db.execute("DELETE FROM parse_cache WHERE model_version != ?", (model_version,))
+            self.db.commit()
+            self.disk_entries = self.db.execute("SELECT COUNT(*) FROM parse_cache").fetchone()[0]
+    
+    def key(self, text):
+        """Cache key for a resume text under the current model and variant"""
+        prefix = f"{self.model_version}+{self.variant}" if self.variant else self.model_version
+        return hashlib.sha256(f"{prefix}\0{text}".encode('utf-8')).hexdigest()
+    
+    def get(self, text):
+        """Return cached entities for `text`, or None on a miss"""
+        key = self.key(text)
+        
+        if key in self.memory:
+            self.memory.move_to_end(key)
+            self.hits += 1
+            return json.loads(self.memory[key])
+        
+        if self.db is not None:
+            row = self.db.execute("SELECT result FROM parse_cache WHERE key = ?", (key,)).fetchone()
+            if row:
+                self.db.execute("UPDATE parse_cache SET last_used = ? WHERE key = ?",
+                                (time.time(), key))
+                self._remember(key, row[0])
+                self._mark_write()
+                self.hits += 1
+                return json.loads(row[0])
+        
+        self.misses += 1
+        return None
+    
+    def put(self, text, entities):
+        """Store the entities parsed from `text`"""
+        key = self.key(text)
+        result = json.dumps(entities, ensure_ascii=False)
+        self._remember(key, result)
+        
+        if self.db is not None:
+            # Only a new key adds a row; a repeat put (the same text missed
+            # twice in one batch) just refreshes the existing one
+            cursor = self.db.execute(
+                "INSERT OR IGNORE INTO parse_cache VALUES (?, ?, ?, ?)",
+                (key, self.model_version, result, time.time())
+            )
+            if cursor.rowcount:
+                self.disk_entries += 1
+            else:
+                self.db.execute("UPDATE parse_cache SET result = ?, last_used = ? WHERE key = ?",
+                                (result, time.time(), key))
+            if self.disk_entries > self.max_disk_entries:
+                self._evict_disk()
+            self._mark_write()
+    
+    def _remember(self, key, result):
+        """Insert into the in-memory LRU tier"""
+        self.memory[key] = result
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_size:
+            self.memory.popitem(last=False)
+    
+    def _evict_disk(self):
+        """Drop the least recently used 10% of on-disk entries"""
+        n_evict = max(1, self.max_disk_entries // 10)
+        self.db.execute(
+            "DELETE FROM parse_cache WHERE key IN "
+            "(SELECT key FROM parse_cache ORDER BY last_used LIMIT ?)", (n_evict,)
+        )
+        self.disk_entries = self.db.execute("SELECT COUNT(*) FROM parse_cache").fetchone()[0]
+    
+    def _mark_write(self):
+        """Commit to SQLite every `commit_every` writes"""
+        self._pending_writes += 1
+        if self._pending_writes >= self.commit_every:
+            self.db.commit()
+            self._pending_writes = 0
+    
+    def close(self):
+        """Flush pending writes and close the database"""
+        if self.db is not None:
+            self.db.commit()
+            self.db.close()
+            self.db = None
+    
+    def stats(self):
+        """Hit/miss counters for reporting"""
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+        }
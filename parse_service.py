@@ -0,0 +1,233 @@
+# parse_service.py
+"""
+Long-lived HTTP parse service with micro-batching
+Holds one loaded ResumeParser and groups concurrent requests into
+nlp.pipe batches. Returns 429 when the request queue is full.
+Usage: python parse_service.py [--port 8080] [--max-batch-size 32] [--max-wait-ms 10]
+
+    POST /parse    {"text": "..."}  or  {"texts": ["...", "..."]}
+    GET  /health
+    GET  /metrics  (pipeline timings and counters as JSON)
+"""
+
+import argparse
+import asyncio
+import json
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from resume_parser import ResumeParser
+from instrumentation import metrics, configure_sinks_from_env
+
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 429: 'Too Many Requests', 500: 'Internal Server Error'}
+
+class QueueFull(Exception):
+    """Raised when the batcher cannot take more work"""
+
+class MicroBatcher:
+    """Collects texts from concurrent callers and parses them in batches
+    
+    A batch is dispatched once it holds `max_batch_size` texts or the
+    oldest text has waited `max_wait` seconds, whichever comes first.
+    Inference runs on a single worker thread so the event loop keeps
+    accepting requests meanwhile.
+    """
+    
+    def __init__(self, parser, max_batch_size=32, max_wait=0.01, max_queue=1024):
+        self.parser = parser
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.task = None
+    
+    def start(self):
+        """Start the batching loop on the running event loop"""
+        self.task = asyncio.get_running_loop().create_task(self._run())
+    
+    async def submit(self, texts):
+        """Queue texts for parsing and wait for their entities; raises QueueFull if they don't fit now"""
+        if self.queue.maxsize - self.queue.qsize() < len(texts):
+            raise QueueFull()
+        loop = asyncio.get_running_loop()
+        futures = []
+        for text in texts:
+            future = loop.create_future()
+            self.queue.put_nowait((text, future))
+            futures.append(future)
+        return await asyncio.gather(*futures)
+    
+    async def _run(self):
+        """Pull batches off the queue and hand them to the worker thread"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            texts = [text for text, _ in batch]
+            metrics.count('service_batches')
+            metrics.count('service_batched_docs', len(batch))
+            try:
+                results = await loop.run_in_executor(self.executor, self._parse_batch, texts)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), entities in zip(batch, results):
+                if not future.done():
+                    future.set_result(entities)
+    
+    def _parse_batch(self, texts):
+        """Parse one batch (runs on the worker thread)"""
+        return list(self.parser.parse_resumes_bulk(texts, batch_size=len(texts)))
+
+class ParseService:
+    """Minimal asyncio HTTP/1.1 front end for the MicroBatcher"""
+    
+    def __init__(self, batcher, max_body=5 * 1024 * 1024):
+        self.batcher = batcher
+        self.max_body = max_body
+    
+    async def handle_connection(self, reader, writer):
+        """Serve requests on one (possibly keep-alive) connection"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    await self._respond(writer, 400, {'error': 'malformed request line'}, False)
+                    break
+                
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                
+                keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+                try:
+                    length = int(headers.get('content-length', 0) or 0)
+                    if length < 0:
+                        raise ValueError(length)
+                except ValueError:
+                    await self._respond(writer, 400, {'error': 'invalid Content-Length'}, False)
+                    break
+                if length > self.max_body:
+                    await self._respond(writer, 413, {'error': 'body too large'}, False)
+                    break
+                body = await reader.readexactly(length) if length else b''
+                
+                status, payload = await self.route(method, path, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+    
+    async def route(self, method, path, body):
+        """Dispatch one request, returning (status, JSON payload)"""
+        if path == '/health':
+            return 200, {'status': 'ok', 'queued': self.batcher.queue.qsize()}
+        if path == '/metrics':
+            return 200, metrics.summary()
+        if path != '/parse':
+            return 404, {'error': f'unknown path {path}'}
+        if method != 'POST':
+            return 405, {'error': 'use POST'}
+        
+        try:
+            request = json.loads(body or b'{}')
+            if not isinstance(request, dict):
+                raise TypeError('body must be a JSON object')
+            texts = request['texts'] if 'texts' in request else [request['text']]
+            if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+                raise TypeError('texts must be a list of strings')
+        except (ValueError, KeyError, TypeError) as e:
+            return 400, {'error': f'expected {{"text": ...}} or {{"texts": [...]}} ({e})'}
+        
+        if len(texts) > self.batcher.queue.maxsize:
+            # Could never fit in the queue, so retrying after a 429 would not help
+            return 413, {'error': f'too many texts ({len(texts)}); '
+                                  f'at most {self.batcher.queue.maxsize} per request'}
+        
+        try:
+            results = await self.batcher.submit(texts)
+        except QueueFull:
+            metrics.count('service_rejected')
+            return 429, {'error': 'parse queue full, retry later'}
+        except Exception as e:
+            return 500, {'error': str(e)}
+        metrics.count('service_requests')
+        
+        if 'texts' in request:
+            return 200, {'results': results}
+        return 200, {'entities': results[0]}
+    
+    async def _respond(self, writer, status, payload, keep_alive):
+        """Write a JSON response"""
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n")
+        if status == 429:
+            head += "Retry-After: 1\r\n"
+        writer.write(head.encode('latin-1') + b"\r\n" + body)
+        await writer.drain()
+
+async def serve(parser, host='0.0.0.0', port=8080, max_batch_size=32, max_wait=0.01, max_queue=1024):
+    """Run the service until cancelled"""
+    batcher = MicroBatcher(parser, max_batch_size=max_batch_size, max_wait=max_wait, max_queue=max_queue)
+    batcher.start()
+    service = ParseService(batcher)
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"✅ Parse service listening on http://{host}:{port} "
+          f"(max_batch_size={max_batch_size}, max_wait={max_wait * 1000:.0f}ms, max_queue={max_queue})")
+    # SIGTERM (e.g. from an orchestrator) stops accepting and exits cleanly
+    stop = asyncio.get_running_loop().create_future()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set_result, None)
+    async with server:
+        await stop
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Resume parse HTTP service")
+    arg_parser.add_argument('--host', default='0.0.0.0')
+    arg_parser.add_argument('--port', type=int, default=8080)
+    arg_parser.add_argument('--model', default=None,
+                            help="model dir or .pack file (default: fresh pack, else directory)")
+    arg_parser.add_argument('--cache', default=None, help="SQLite parse cache path")
+    arg_parser.add_argument('--rules', action='store_true', help="regex stage for structured fields")
+    arg_parser.add_argument('--max-batch-size', type=int, default=32)
+    arg_parser.add_argument('--max-wait-ms', type=float, default=10.0)
+    arg_parser.add_argument('--max-queue', type=int, default=1024)
+    args = arg_parser.parse_args()
+    
+    configure_sinks_from_env()
+    parser = ResumeParser(args.model, cache_path=args.cache, rules=args.rules)
+    try:
+        asyncio.run(serve(parser, args.host, args.port, args.max_batch_size,
+                          args.max_wait_ms / 1000, args.max_queue))
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        parser.close()
+        metrics.report()
+
+if __name__ == "__main__":
+    main()
@@ -5,10 +5,219 @@ This helps you annotate 30-40 resumes quickly
 """
 
 import json
-import re
+import os
+import mmap
+import struct
+import hashlib
+from array import array
+from bisect import bisect_left
+from collections import deque
 
-class QuickAnnotator:
+INDEX_MAGIC = b'GAZIDX01'
+
+# Lexicon files picked up by main() when present, one term per line
+DEFAULT_GAZETTEERS = {
+    'SKILL': 'gazetteers/skills.txt',
+    'JOB_TITLE': 'gazetteers/job_titles.txt',
+    'COMPANY': 'gazetteers/companies.txt',
+    'DEGREE': 'gazetteers/degrees.txt',
+}
+
+def _is_word_char(char):
+    """Same notion of a word character as regex \\w"""
+    return char.isalnum() or char == '_'
+
+def _at_word_boundary(text, index):
+    """True where regex \\b would match in `text` at `index`"""
+    before = index > 0 and _is_word_char(text[index - 1])
+    after = index < len(text) and _is_word_char(text[index])
+    return before != after
+
+class TermMatcher:
+    """Aho-Corasick automaton that finds every gazetteer term in one pass"""
+    
     def __init__(self):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+    
+    def add_term(self, term, label):
+        """Add a lowercase term to the trie under `label`"""
+        if not term:
+            return
+        node = 0
+        for char in term:
+            child = self.goto[node].get(char)
+            if child is None:
+                child = len(self.goto)
+                self.goto[node][char] = child
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = child
+        self.output[node].append((len(term), label))
+    
+    def build(self):
+        """Compute failure links; call once after all terms are added"""
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                if self.output[self.fail[child]]:
+                    self.output[child] = self.output[child] + self.output[self.fail[child]]
+        return self
+    
+    def find_all(self, text):
+        """Yield (start, end, label) for every term occurrence bounded by \\b"""
+        goto, fail, output = self.goto, self.fail, self.output
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, label in output[node]:
+                start, end = i + 1 - length, i + 1
+                if _at_word_boundary(text, start) and _at_word_boundary(text, end):
+                    yield start, end, label
+    
+    def save(self, index_path, fingerprint):
+        """Write the built automaton as a flat binary index
+        
+        Layout: magic, header length, JSON header, then uint32 arrays
+        (edge offsets, edge chars, edge targets, fail links, output
+        offsets, output lengths, output label ids). The file is written
+        to a temp name and renamed so readers never see a partial index.
+        """
+        labels = sorted({label for outputs in self.output for _, label in outputs})
+        label_ids = {label: i for i, label in enumerate(labels)}
+        
+        edge_offsets, edge_chars, edge_targets = array('I', [0]), array('I'), array('I')
+        out_offsets, out_lengths, out_labels = array('I', [0]), array('I'), array('I')
+        for node, edges in enumerate(self.goto):
+            for char in sorted(edges):
+                edge_chars.append(ord(char))
+                edge_targets.append(edges[char])
+            edge_offsets.append(len(edge_chars))
+            for length, label in self.output[node]:
+                out_lengths.append(length)
+                out_labels.append(label_ids[label])
+            out_offsets.append(len(out_lengths))
+        
+        sections = [edge_offsets, edge_chars, edge_targets, array('I', self.fail),
+                    out_offsets, out_lengths, out_labels]
+        header = json.dumps({
+            'fingerprint': fingerprint,
+            'labels': labels,
+            'sizes': [len(section) for section in sections],
+        }).encode('utf-8')
+        header += b' ' * (-len(header) % 4)  # keep the arrays 4-byte aligned
+        
+        tmp_path = f"{index_path}.tmp{os.getpid()}"
+        with open(tmp_path, 'wb') as f:
+            f.write(INDEX_MAGIC)
+            f.write(struct.pack('<I', len(header)))
+            f.write(header)
+            for section in sections:
+                f.write(section.tobytes())
+        os.replace(tmp_path, index_path)
+
+class CompiledTermMatcher:
+    """Read-only TermMatcher backed by a memory-mapped index file
+    
+    The arrays are used in place from the mapping, so startup cost does
+    not grow with gazetteer size and processes share the same pages.
+    """
+    
+    def __init__(self, index_path):
+        with open(index_path, 'rb') as f:
+            self.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        view = memoryview(self.mmap)
+        if bytes(view[:len(INDEX_MAGIC)]) != INDEX_MAGIC:
+            raise ValueError(f"Not a gazetteer index: {index_path}")
+        offset = len(INDEX_MAGIC)
+        (header_len,) = struct.unpack_from('<I', view, offset)
+        offset += 4
+        header = json.loads(bytes(view[offset:offset + header_len]))
+        offset += header_len
+        
+        self.fingerprint = header['fingerprint']
+        self.labels = header['labels']
+        sections = []
+        for size in header['sizes']:
+            sections.append(view[offset:offset + size * 4].cast('I'))
+            offset += size * 4
+        (self.edge_offsets, self.edge_chars, self.edge_targets, self.fail,
+         self.out_offsets, self.out_lengths, self.out_labels) = sections
+    
+    @classmethod
+    def open(cls, index_path, fingerprint):
+        """Map an existing index, or return None if missing or stale"""
+        if not os.path.exists(index_path):
+            return None
+        try:
+            matcher = cls(index_path)
+        except (ValueError, struct.error):
+            return None
+        return matcher if matcher.fingerprint == fingerprint else None
+    
+    def find_all(self, text):
+        """Yield (start, end, label) for every term occurrence bounded by \\b"""
+        edge_offsets, edge_chars, edge_targets = self.edge_offsets, self.edge_chars, self.edge_targets
+        fail, out_offsets, out_lengths, out_labels = self.fail, self.out_offsets, self.out_lengths, self.out_labels
+        labels = self.labels
+        node = 0
+        for i, char in enumerate(text):
+            code = ord(char)
+            while True:
+                lo, hi = edge_offsets[node], edge_offsets[node + 1]
+                j = bisect_left(edge_chars, code, lo, hi)
+                if j < hi and edge_chars[j] == code:
+                    node = edge_targets[j]
+                    break
+                if node == 0:
+                    break
+                node = fail[node]
+            for k in range(out_offsets[node], out_offsets[node + 1]):
+                start, end = i + 1 - out_lengths[k], i + 1
+                if _at_word_boundary(text, start) and _at_word_boundary(text, end):
+                    yield start, end, labels[out_labels[k]]
+
+def iter_lexicon(file_path):
+    """Yield lowercase terms from a lexicon file (one per line, # comments)"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            term = line.strip().lower()
+            if term and not term.startswith('#'):
+                yield term
+
+def gazetteer_fingerprint(builtin_terms, gazetteer_files):
+    """Hash the built-in terms and lexicon file contents that make up an index"""
+    digest = hashlib.sha256(INDEX_MAGIC)
+    for label, term in sorted(builtin_terms):
+        digest.update(f"{label}\t{term}\n".encode('utf-8'))
+    for label, file_path in sorted(gazetteer_files.items()):
+        digest.update(f"{label}\t{os.path.abspath(file_path)}\n".encode('utf-8'))
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+class QuickAnnotator:
+    def __init__(self, gazetteer_files=None, index_path='gazetteer.idx'):
+        """Set up auto-annotation
+        
+        `gazetteer_files` maps a label (SKILL, JOB_TITLE, COMPANY, DEGREE)
+        to a lexicon file. When given, the lexicons are compiled once into
+        a binary index at `index_path` and memory-mapped on later runs.
+        """
+        self.gazetteer_files = gazetteer_files or {}
+        self.index_path = index_path
         self.annotations = []
         self.current_index = 0
         
@@ -25,34 +234,49 @@ class QuickAnnotator:
             'full stack developer', 'backend developer', 'frontend developer',
             'devops engineer', 'project manager', 'product manager'
         }
+        
+        self.build_matcher()
+    
+    def build_matcher(self):
+        """Compile the gazetteers into a single matcher
+        
+        Call again after changing common_skills or common_titles.
+        """
+        builtin_terms = [(term.lower(), "SKILL") for term in self.common_skills]
+        builtin_terms += [(term.lower(), "JOB_TITLE") for term in self.common_titles]
+        
+        if self.gazetteer_files:
+            fingerprint = gazetteer_fingerprint(
+                [(label, term) for term, label in builtin_terms], self.gazetteer_files)
+            self.matcher = CompiledTermMatcher.open(self.index_path, fingerprint)
+            if self.matcher is not None:
+                return
+            print(f"Compiling gazetteer index: {self.index_path}...")
+        
+        matcher = TermMatcher()
+        for term, label in builtin_terms:
+            matcher.add_term(term, label)
+        for label, file_path in self.gazetteer_files.items():
+            for term in iter_lexicon(file_path):
+                matcher.add_term(term, label)
+        matcher.build()
+        
+        if self.gazetteer_files:
+            matcher.save(self.index_path, fingerprint)
+            self.matcher = CompiledTermMatcher(self.index_path)
+        else:
+            self.matcher = matcher
     
     def find_entities_auto(self, text):
         """Auto-detect common entities to speed up annotation"""
-        entities = []
         text_lower = text.lower()
         
-        # Find skills
-        for skill in self.common_skills:
-            pattern = r'\b' + re.escape(skill) + r'\b'
-            for match in re.finditer(pattern, text_lower):
-                start = match.start()
-                end = match.end()
-                # Get actual cased text
-                actual_text = text[start:end]
-                entities.append((start, end, "SKILL", actual_text))
-        
-        # Find job titles
-        for title in self.common_titles:
-            pattern = r'\b' + re.escape(title) + r'\b'
-            for match in re.finditer(pattern, text_lower):
-                start = match.start()
-                end = match.end()
-                actual_text = text[start:end]
-                entities.append((start, end, "JOB_TITLE", actual_text))
-        
-        # Remove duplicates
-        entities = list(set(entities))
-        entities.sort(key=lambda x: x[0])
+        # One pass over the text finds skills and job titles alike;
+        # actual cased text comes from the original
+        entities = {(start, end, label, text[start:end])
+                    for start, end, label in self.matcher.find_all(text_lower)}
+        
+        entities = sorted(entities, key=lambda x: (x[0], x[1], x[2]))
         
         return entities
     
@@ -139,7 +363,9 @@ def main():
     num_to_annotate = input(f"\nHow many resumes to annotate? (recommended: 30-40): ").strip()
     num_to_annotate = int(num_to_annotate) if num_to_annotate else 30
     
-    annotator = QuickAnnotator()
+    gazetteer_files = {label: path for label, path in DEFAULT_GAZETTEERS.items()
+                       if os.path.exists(path)}
+    annotator = QuickAnnotator(gazetteer_files=gazetteer_files)
     annotator.annotate_batch(resumes, num_to_annotate)
 
 if __name__ == "__main__":
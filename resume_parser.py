@@ -7,23 +7,192 @@ Usage: python resume_parser.py
 import spacy
 import json
 import os
-from collections import defaultdict
+import re
+import time
+import multiprocessing
+from collections import defaultdict, deque
+from itertools import count
+from spacy.util import minibatch
+from parse_cache import ParseCache, model_version
+from instrumentation import metrics, configure_sinks_from_env
+from model_pack import PACK_SUFFIX, pack_model, load_packed_model, is_pack_fresh
+from text_normalization import default_normalizer
+from batching import bucketed_batches
+from entity_rules import clean_structured_value
+from dedup import group_duplicates
+from entity_table import TABLE_SUFFIX, ROW_GROUP_SIZE, EntityTableWriter
+
+DEFAULT_MODEL_PATH = './resume_ner_model'
+
+# Token budget per inference batch, and how many batches' worth of docs
+# are tokenized together and bucketed by length
+BATCH_TOKENS = 50000
+BUCKET_BUFFER_BATCHES = 8
+
+# Preferred cut points for chunking, strongest first: blank lines
+# (section/paragraph breaks, incl. PDF-style " \n \n"), line breaks, spaces
+CHUNK_BOUNDARIES = [re.compile(r'\n[ \t]*\n\s*'), re.compile(r'\n'), re.compile(r'\s')]
+
+def _find_cut(text, lo, hi):
+    """Last boundary position in text[lo:hi], trying stronger boundaries first"""
+    for pattern in CHUNK_BOUNDARIES:
+        cut = None
+        for match in pattern.finditer(text, lo, hi):
+            cut = match.end()
+        if cut is not None and cut > lo:
+            return cut
+    return hi
+
+def split_into_chunks(text, max_chars, overlap=200):
+    """Split text into (offset, chunk) pieces of at most `max_chars`
+    
+    Cuts fall on section/paragraph breaks where possible, otherwise on
+    line breaks or whitespace. Consecutive chunks share about `overlap`
+    characters so entities near a cut are seen whole by one of them.
+    """
+    if len(text) <= max_chars:
+        return [(0, text)]
+    
+    overlap = min(overlap, max_chars // 4)
+    chunks = []
+    start = 0
+    while True:
+        end = start + max_chars
+        if end >= len(text):
+            chunks.append((start, text[start:]))
+            return chunks
+        cut = _find_cut(text, start + max_chars // 2, end)
+        chunks.append((start, text[start:cut]))
+        
+        # Back up by the overlap, then forward to a word start
+        next_start = cut - overlap
+        space = re.compile(r'\s').search(text, next_start, cut)
+        start = space.end() if space else next_start
+
+def stitch_chunk_spans(chunks, chunk_spans):
+    """Merge per-chunk (start, end, label) spans into document offsets
+    
+    Each overlap region is split at its midpoint and a span is kept only
+    by the chunk that owns its start, so entities seen twice count once.
+    Any remaining overlaps (an entity cut short at a chunk edge) resolve
+    to the longer span.
+    """
+    spans = []
+    for i, ((offset, chunk), found) in enumerate(zip(chunks, chunk_spans)):
+        lower = 0 if i == 0 else (offset + chunks[i - 1][0] + len(chunks[i - 1][1])) // 2
+        if i + 1 < len(chunks):
+            upper = (chunks[i + 1][0] + offset + len(chunk)) // 2
+        else:
+            upper = offset + len(chunk) + 1
+        for start, end, label in found:
+            if lower <= start + offset < upper:
+                spans.append((start + offset, end + offset, label))
+    
+    spans.sort()
+    merged = []
+    for span in spans:
+        if merged and span[0] < merged[-1][1]:
+            if span[1] - span[0] > merged[-1][1] - merged[-1][0]:
+                merged[-1] = span
+            continue
+        merged.append(span)
+    return merged
+
+def default_model_path():
+    """The packed model if it is up to date, else the model directory"""
+    pack_file = DEFAULT_MODEL_PATH + PACK_SUFFIX
+    return pack_file if is_pack_fresh(pack_file, DEFAULT_MODEL_PATH) else DEFAULT_MODEL_PATH
 
 class ResumeParser:
-    def __init__(self, model_path='./resume_ner_model'):
-        """Initialize parser with trained model"""
+    def __init__(self, model_path=None, cache_path=None, cache_memory_size=10000,
+                 chunk_chars=None, chunk_overlap=200, normalize=False, max_batch_tokens=BATCH_TOKENS,
+                 rules=False):
+        """Initialize parser with trained model
+        
+        `model_path` may be a model directory or a .pack file from
+        model_pack.py (faster to load); by default a fresh pack next to
+        ./resume_ner_model is preferred. Pass `cache_path` (a SQLite file)
+        to cache parse results by text hash and model version; repeat
+        resumes then skip inference.
+        
+        Texts longer than `chunk_chars` (default: spaCy's max_length) are
+        split into overlapping chunks, batched, and their entities
+        stitched back together, which bounds per-doc memory.
+        
+        With `normalize=True` extraction noise is stripped before
+        tokenization (see text_normalization.py); entity offsets are
+        mapped back onto the original text.
+        
+        Bulk parsing groups docs of similar token length into batches of
+        at most `max_batch_tokens` padded tokens (None: plain batches of
+        `batch_size` docs); results still come back in input order.
+        
+        With `rules=True` EMAIL, PHONE, LINKEDIN, CGPA and DOB come from
+        a regex stage around the NER, merged by the priority policy in
+        entity_rules.py.
+        """
+        self.max_batch_tokens = max_batch_tokens
+        self.chunk_chars = chunk_chars
+        self.chunk_overlap = chunk_overlap
+        self.normalizer = default_normalizer() if normalize else None
+        model_path = model_path or default_model_path()
         print(f"Loading model from {model_path}...")
-        self.nlp = spacy.load(model_path)
-        print("✅ Model loaded successfully")
+        start_time = time.perf_counter()
+        if model_path.endswith(PACK_SUFFIX):
+            self.nlp, version = load_packed_model(model_path)
+        else:
+            self.nlp = spacy.load(model_path)
+            version = None
+        print(f"✅ Model loaded successfully ({time.perf_counter() - start_time:.2f}s)")
+        
+        self.rules = rules
+        if rules:
+            self.nlp.add_pipe('resume_entity_rules', before='ner')
+            self.nlp.add_pipe('resume_entity_merge', after='ner')
+        
+        self.cache = None
+        if cache_path:
+            # Options that change the output get their own cache entries
+            version = version or model_version(model_path)
+            variant = [name for name, enabled in (('normalize', normalize), ('rules', rules)) if enabled]
+            self.cache = ParseCache(version, db_path=cache_path, variant='+'.join(variant),
+                                    memory_size=cache_memory_size)
     
     def parse_resume(self, text):
         """Parse a single resume and extract entities"""
-        doc = self.nlp(text)
+        if self.cache is not None:
+            cached = self.cache.get(text)
+            if cached is not None:
+                return cached
         
+        if self.normalizer is not None or len(text) > self._chunk_limit():
+            _, spans, _ = next(self._run_spans(iter([(text, None)])))
+            entities = self._entities_from_spans(text, spans)
+        else:
+            with metrics.timer('tokenization'):
+                doc = self.nlp.make_doc(text)
+            with metrics.timer('ner_inference'):
+                for _, component in self.nlp.pipeline:
+                    doc = component(doc)
+            metrics.count('docs_parsed')
+            metrics.count('chars_parsed', len(text))
+            entities = self._entities_from_doc(doc)
+        
+        if self.cache is not None:
+            self.cache.put(text, entities)
+        return entities
+    
+    def _entities_from_doc(self, doc):
+        """Group a processed doc's entities by label"""
+        spans = [(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents]
+        return self._entities_from_spans(doc.text, spans)
+    
+    def _entities_from_spans(self, text, spans):
+        """Group (start, end, label) spans over `text` by label"""
         # Organize entities by type
         entities = defaultdict(list)
-        for ent in doc.ents:
-            entities[ent.label_].append(ent.text)
+        for start, end, label in spans:
+            entities[label].append(self._entity_value(text, start, end, label))
         
         # Remove duplicates
         for key in entities:
@@ -31,6 +200,15 @@ class ResumeParser:
         
         return dict(entities)
     
+    def _entity_value(self, text, start, end, label):
+        """Text of one entity span, cleaned the way the parse options ask"""
+        value = text[start:end]
+        if self.normalizer is not None:
+            value = self.normalizer.clean(value)
+        if self.rules:
+            value = clean_structured_value(label, value)
+        return value
+    
     def parse_resume_file(self, file_path):
         """Parse resume from file"""
         # Extract text based on file type
@@ -47,8 +225,146 @@ class ResumeParser:
         
         return self.parse_resume(text)
     
-    def parse_multiple_resumes(self, resume_folder='./resumes'):
-        """Parse all resumes in a folder"""
+    def _run_pipeline(self, items, batch_size=64, n_process=1):
+        """Run (text, context) pairs through the pipeline, yielding (doc, context) in order
+        
+        In a single process this is nlp.pipe unrolled so tokenization and
+        NER inference are timed separately; with worker processes both
+        are charged to ner_inference. In a single process, docs are
+        tokenized a buffer at a time and bucketed by token length for
+        inference, then handed back in buffer order.
+        """
+        if n_process != 1:
+            docs = self.nlp.pipe(items, as_tuples=True, batch_size=batch_size, n_process=n_process)
+            for doc, context in metrics.timed_iter(docs, 'ner_inference'):
+                metrics.count('docs_parsed')
+                metrics.count('chars_parsed', len(doc.text))
+                yield doc, context
+            return
+        
+        buffer_size = batch_size * BUCKET_BUFFER_BATCHES if self.max_batch_tokens else batch_size
+        for buffer in minibatch(items, size=buffer_size):
+            with metrics.timer('tokenization'):
+                docs = [self.nlp.make_doc(text) for text, _ in buffer]
+            with metrics.timer('ner_inference'):
+                if self.max_batch_tokens:
+                    batches = bucketed_batches(range(len(docs)), lambda i: len(docs[i]), self.max_batch_tokens,
+                                               max_items=batch_size, buffer_size=len(docs))
+                else:
+                    batches = [range(len(docs))]
+                for batch in batches:
+                    batch_docs = [docs[i] for i in batch]
+                    for _, component in self.nlp.pipeline:
+                        if hasattr(component, 'pipe'):
+                            batch_docs = list(component.pipe(batch_docs, batch_size=len(batch_docs)))
+                        else:
+                            batch_docs = [component(doc) for doc in batch_docs]
+                    for i, doc in zip(batch, batch_docs):
+                        docs[i] = doc
+            metrics.count('docs_parsed', len(docs))
+            metrics.count('chars_parsed', sum(len(text) for text, _ in buffer))
+            metrics.count('tokens_parsed', sum(len(doc) for doc in docs))
+            for doc, (_, context) in zip(docs, buffer):
+                yield doc, context
+    
+    def _chunk_limit(self):
+        return self.chunk_chars or self.nlp.max_length
+    
+    def _run_spans(self, items, batch_size=64, n_process=1):
+        """Like _run_pipeline, but yields (text, spans, context) and chunks long texts
+        
+        Chunks of one text travel through the same batches as everything
+        else; a text is yielded once all of its chunks are back, in input
+        order.
+        """
+        limit = self._chunk_limit()
+        entries = {}
+        order = deque()
+        seq = count()
+        
+        def chunked():
+            for text, context in items:
+                entry_id = next(seq)
+                normalized = None
+                if self.normalizer is not None:
+                    with metrics.timer('normalization'):
+                        normalized = self.normalizer.normalize(text)
+                    metrics.count('chars_removed_by_normalization', len(text) - len(normalized.text))
+                chunks = split_into_chunks(normalized.text if normalized else text,
+                                           limit, self.chunk_overlap)
+                if len(chunks) > 1:
+                    metrics.count('chunks', len(chunks))
+                entries[entry_id] = [text, context, chunks, [None] * len(chunks), len(chunks), normalized]
+                order.append(entry_id)
+                for index, (_, chunk) in enumerate(chunks):
+                    yield chunk, (entry_id, index)
+        
+        for doc, (entry_id, index) in self._run_pipeline(chunked(), batch_size=batch_size,
+                                                          n_process=n_process):
+            entry = entries[entry_id]
+            entry[3][index] = [(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents]
+            entry[4] -= 1
+            while order and entries[order[0]][4] == 0:
+                text, context, chunks, chunk_spans, _, normalized = entries.pop(order.popleft())
+                spans = chunk_spans[0] if len(chunks) == 1 else stitch_chunk_spans(chunks, chunk_spans)
+                if normalized is not None:
+                    spans = [(*normalized.to_original(start, end), label) for start, end, label in spans]
+                yield text, spans, context
+    
+    def _pipe_entities(self, items, batch_size=64, n_process=1):
+        """Run (text, context) pairs through nlp.pipe, yielding (entities, context) in order
+        
+        Cache hits skip the model; they are held back only until every
+        earlier miss has come out of the pipe, so input order is kept.
+        """
+        if self.cache is None:
+            results = self._run_spans(items, batch_size=batch_size, n_process=n_process)
+            for text, spans, context in results:
+                yield self._entities_from_spans(text, spans), context
+            return
+        
+        slots = {}
+        order = deque()
+        seq = count()
+        
+        def misses():
+            for text, context in items:
+                slot_id = next(seq)
+                slots[slot_id] = [self.cache.get(text), context, text]
+                order.append(slot_id)
+                if slots[slot_id][0] is None:
+                    yield text, slot_id
+        
+        def ready():
+            while order and slots[order[0]][0] is not None:
+                entities, context, _ = slots.pop(order.popleft())
+                yield entities, context
+        
+        results = self._run_spans(misses(), batch_size=batch_size, n_process=n_process)
+        for text, spans, slot_id in results:
+            slot = slots[slot_id]
+            slot[0] = self._entities_from_spans(text, spans)
+            self.cache.put(slot[2], slot[0])
+            yield from ready()
+        yield from ready()
+    
+    def parse_resumes_bulk(self, texts, batch_size=64, n_process=1):
+        """Parse many resume texts with nlp.pipe, results in input order"""
+        items = ((text, None) for text in texts)
+        for entities, _ in self._pipe_entities(items, batch_size=batch_size, n_process=n_process):
+            yield entities
+    
+    def parse_multiple_resumes(self, resume_folder='./resumes', batch_size=64, n_process=1,
+                               dedup=False, dedup_threshold=0.9):
+        """Parse all resumes in a folder
+        
+        Resumes are fed through nlp.pipe in batches of `batch_size`; set
+        `n_process` > 1 (or -1 for all cores) to spread inference across
+        worker processes. With `dedup=True`, exact copies and resumes at
+        least `dedup_threshold` similar to an earlier one (see dedup.py)
+        are not parsed again: they get their representative's entities,
+        plus `duplicate_of` and `similarity` keys naming it.
+        """
         results = []
         
         # Load extracted resumes
@@ -56,18 +372,168 @@ class ResumeParser:
             with open('extracted_resumes.json', 'r', encoding='utf-8') as f:
                 resumes = json.load(f)
             
-            print(f"\nParsing {len(resumes)} resumes...")
+            print(f"\nParsing {len(resumes)} resumes "
+                  f"(batch_size={batch_size}, n_process={n_process})...")
+            
+            start_time = time.perf_counter()
+            if dedup:
+                with metrics.timer('dedup'):
+                    groups = group_duplicates((resume['text'] for resume in resumes),
+                                              threshold=dedup_threshold)
+                n_exact = sum(rep != index and resumes[rep]['text'] == resumes[index]['text']
+                              for index, (rep, _) in enumerate(groups))
+                n_near = sum(rep != index for index, (rep, _) in enumerate(groups)) - n_exact
+                metrics.count('duplicates_exact', n_exact)
+                metrics.count('duplicates_near', n_near)
+                print(f"Dedup: {n_exact} exact and {n_near} near duplicates, "
+                      f"parsing {len(resumes) - n_exact - n_near} unique resumes")
+            else:
+                groups = [(index, 1.0) for index in range(len(resumes))]
+            
+            unique = [index for index, (rep, _) in enumerate(groups) if rep == index]
+            texts = (resumes[index]['text'] for index in unique)
+            parsed = {}
+            for index, entities in zip(unique, self.parse_resumes_bulk(texts, batch_size=batch_size,
+                                                                       n_process=n_process)):
+                parsed[index] = entities
+                print(f"✓ Parsed: {resumes[index]['filename']}")
             
-            for resume in resumes:
-                entities = self.parse_resume(resume['text'])
-                results.append({
+            for index, (resume, (rep, similarity)) in enumerate(zip(resumes, groups)):
+                result = {
                     'filename': resume['filename'],
-                    'entities': entities
-                })
-                print(f"✓ Parsed: {resume['filename']}")
+                    'entities': parsed[rep]
+                }
+                if rep != index:
+                    result['duplicate_of'] = resumes[rep]['filename']
+                    result['similarity'] = round(similarity, 3)
+                results.append(result)
+            
+            elapsed = time.perf_counter() - start_time
+            rate = len(results) / elapsed if elapsed > 0 else 0.0
+            print(f"\n⏱  {len(results)} resumes in {elapsed:.2f}s ({rate:.1f} docs/sec)")
         
         return results
     
+    def iter_resumes_jsonl(self, input_file='extracted_resumes.jsonl'):
+        """Lazily read resumes from a JSONL file, one record per line"""
+        with open(input_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    
+    def parse_resume_stream(self, resumes, batch_size=64, n_process=1):
+        """Parse an iterable of resume records, yielding results as they complete"""
+        pairs = ((resume['text'], resume['filename']) for resume in resumes)
+        for entities, filename in self._pipe_entities(pairs, batch_size=batch_size, n_process=n_process):
+            yield {
+                'filename': filename,
+                'entities': entities
+            }
+    
+    def save_results_jsonl(self, results, output_file='parsed_resumes.jsonl', flush_every=100,
+                           append=False):
+        """Write parsing results to a JSONL file as they are produced
+        
+        The file is truncated first unless `append` is set.
+        """
+        written = 0
+        with open(output_file, 'a' if append else 'w', encoding='utf-8') as f:
+            for result in results:
+                with metrics.timer('serialization'):
+                    f.write(json.dumps(result, ensure_ascii=False) + "\n")
+                written += 1
+                if written % flush_every == 0:
+                    f.flush()
+        print(f"\n✅ {written} results {'appended' if append else 'written'} to: {output_file}")
+        return written
+    
+    def _completed_filenames(self, output_file):
+        """Filenames already in a JSONL results file, dropping a torn last line left by a crash"""
+        done = set()
+        if not os.path.exists(output_file):
+            return done
+        with open(output_file, 'r+', encoding='utf-8') as f:
+            good_end = 0
+            for line in iter(f.readline, ''):
+                if not line.endswith("\n"):
+                    break
+                try:
+                    done.add(json.loads(line)['filename'])
+                except (ValueError, KeyError):
+                    break
+                good_end = f.tell()
+            f.truncate(good_end)
+        return done
+    
+    def parse_resumes_jsonl(self, input_file='extracted_resumes.jsonl',
+                            output_file='parsed_resumes.jsonl',
+                            batch_size=64, n_process=1, flush_every=100, resume=False):
+        """Stream resumes from JSONL through the model into a JSONL sink
+        
+        Only one batch of resumes is held in memory at a time, and results
+        are flushed every `flush_every` records so a crash keeps what was
+        already parsed. A fresh run overwrites `output_file`; with
+        `resume` it is kept and resumes already in it are skipped.
+        """
+        start_time = time.perf_counter()
+        resumes = self.iter_resumes_jsonl(input_file)
+        if resume:
+            done = self._completed_filenames(output_file)
+            if done:
+                print(f"Resuming: skipping {len(done)} resumes already in {output_file}")
+            resumes = (record for record in resumes if record['filename'] not in done)
+        results = self.parse_resume_stream(resumes, batch_size=batch_size, n_process=n_process)
+        count = self.save_results_jsonl(results, output_file, flush_every=flush_every, append=resume)
+        elapsed = time.perf_counter() - start_time
+        rate = count / elapsed if elapsed > 0 else 0.0
+        print(f"⏱  {count} resumes in {elapsed:.2f}s ({rate:.1f} docs/sec)")
+        return count
+    
+    def iter_entity_rows(self, resumes, batch_size=64, n_process=1):
+        """Parse resume records, yielding (filename, [(label, text, start, end), ...]) per resume
+        
+        Unlike parse_resume_stream every occurrence is kept, with its
+        character offsets. The parse cache only holds grouped values, so
+        it is not used here.
+        """
+        pairs = ((resume['text'], resume['filename']) for resume in resumes)
+        for text, spans, filename in self._run_spans(pairs, batch_size=batch_size, n_process=n_process):
+            yield filename, [(label, self._entity_value(text, start, end, label), start, end)
+                             for start, end, label in spans]
+    
+    def parse_resumes_table(self, input_file='extracted_resumes.jsonl',
+                            output_file='parsed_entities' + TABLE_SUFFIX,
+                            batch_size=64, n_process=1, row_group_size=ROW_GROUP_SIZE):
+        """Stream resumes from JSONL into a columnar entity table (see entity_table.py)
+        
+        Rows are written `row_group_size` entities at a time, so memory
+        stays flat however many resumes there are.
+        """
+        start_time = time.perf_counter()
+        written = 0
+        resumes = self.iter_resumes_jsonl(input_file)
+        with EntityTableWriter(output_file, row_group_size=row_group_size) as writer:
+            for filename, rows in self.iter_entity_rows(resumes, batch_size=batch_size,
+                                                        n_process=n_process):
+                with metrics.timer('serialization'):
+                    writer.add(filename, rows)
+                written += 1
+        elapsed = time.perf_counter() - start_time
+        rate = written / elapsed if elapsed > 0 else 0.0
+        print(f"\n✅ {written} resumes written to: {output_file}")
+        print(f"⏱  {written} resumes in {elapsed:.2f}s ({rate:.1f} docs/sec)")
+        return written
+    
+    def close(self):
+        """Flush and close the parse cache, reporting its hit rate"""
+        if self.cache is not None:
+            stats = self.cache.stats()
+            print(f"Cache: {stats['hits']} hits, {stats['misses']} misses "
+                  f"({stats['hit_rate']:.0%} hit rate)")
+            self.cache.close()
+            self.cache = None
+    
     def display_results(self, entities):
         """Display parsed entities in a nice format"""
         print("\n" + "="*80)
@@ -81,10 +547,51 @@ class ResumeParser:
     
     def save_results(self, results, output_file='parsed_resumes.json'):
         """Save parsing results to file"""
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
+        with metrics.timer('serialization'):
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(results, f, indent=2, ensure_ascii=False)
         print(f"\n✅ Results saved to: {output_file}")
 
+_worker_parser = None
+
+def _init_forked_worker():
+    """Forked workers share the parent's model pages but not its cache connection"""
+    _worker_parser.cache = None
+
+def _parse_in_worker(text):
+    """Pool task: parse with the parser inherited from the parent"""
+    return _worker_parser.parse_resume(text)
+
+class PreforkedParserPool:
+    """Worker processes forked from an already-loaded ResumeParser
+    
+    The model is loaded (and warmed up) once in the parent; workers are
+    forked from it and share its memory copy-on-write, so starting a
+    worker costs no model load at all.
+    """
+    
+    def __init__(self, parser, n_workers=None):
+        global _worker_parser
+        _worker_parser = parser
+        parser.nlp("warm up")  # initialise lazy state before forking
+        context = multiprocessing.get_context('fork')
+        self.pool = context.Pool(n_workers or os.cpu_count(), initializer=_init_forked_worker)
+    
+    def imap(self, texts, chunksize=8):
+        """Parse texts across the workers, yielding entities in input order"""
+        return self.pool.imap(_parse_in_worker, texts, chunksize)
+    
+    def close(self):
+        """Wait for outstanding work and stop the workers"""
+        self.pool.close()
+        self.pool.join()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+
 def demo_single_resume():
     """Demo: Parse a single resume text"""
     parser = ResumeParser()
@@ -113,11 +620,11 @@ def demo_single_resume():
     entities = parser.parse_resume(sample_resume)
     parser.display_results(entities)
 
-def parse_all_resumes():
-    """Parse all resumes in the dataset"""
-    parser = ResumeParser()
+def parse_all_resumes(dedup=True, dedup_threshold=0.9):
+    """Parse all resumes in the dataset, skipping duplicates unless `dedup` is False"""
+    parser = ResumeParser(cache_path='parse_cache.db')
     
-    results = parser.parse_multiple_resumes()
+    results = parser.parse_multiple_resumes(dedup=dedup, dedup_threshold=dedup_threshold)
     
     # Display sample result
     if results:
@@ -130,6 +637,32 @@ def parse_all_resumes():
         parser.save_results(results)
         
         print(f"\n✅ Parsed {len(results)} resumes successfully!")
+    
+    parser.close()
+
+def parse_all_resumes_streaming():
+    """Parse extracted_resumes.jsonl into parsed_resumes.jsonl without loading it all"""
+    parser = ResumeParser(cache_path='parse_cache.db')
+    
+    if not os.path.exists('extracted_resumes.jsonl'):
+        print("❌ extracted_resumes.jsonl not found")
+        print("Run 'python extract_resumes.py' first")
+        return
+    
+    parser.parse_resumes_jsonl()
+    parser.close()
+
+def parse_all_resumes_table():
+    """Parse extracted_resumes.jsonl into a columnar entity table"""
+    parser = ResumeParser()
+    
+    if not os.path.exists('extracted_resumes.jsonl'):
+        print("❌ extracted_resumes.jsonl not found")
+        print("Run 'python extract_resumes.py' first")
+        return
+    
+    parser.parse_resumes_table()
+    parser.close()
 
 def interactive_mode():
     """Interactive mode - paste resume text and get results"""
@@ -161,8 +694,13 @@ def main():
     print("1. Demo with sample resume")
     print("2. Parse all resumes in dataset")
     print("3. Interactive mode (paste resume text)")
+    print("4. Stream-parse resumes (JSONL in/out)")
+    print("5. Pack model for fast loading")
+    print("6. Stream-parse resumes into a columnar entity table")
     
-    choice = input("\nEnter choice (1/2/3): ").strip()
+    choice = input("\nEnter choice (1/2/3/4/5/6): ").strip()
+    
+    configure_sinks_from_env()
     
     if choice == '1':
         demo_single_resume()
@@ -170,8 +708,17 @@ def main():
         parse_all_resumes()
     elif choice == '3':
         interactive_mode()
+    elif choice == '4':
+        parse_all_resumes_streaming()
+    elif choice == '5':
+        pack_model(DEFAULT_MODEL_PATH)
+    elif choice == '6':
+        parse_all_resumes_table()
     else:
         print("Invalid choice!")
+        return
+    
+    metrics.report()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
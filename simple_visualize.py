@@ -4,17 +4,18 @@ Simple visualization for parsed resumes (no evaluation)
 Usage: python simple_visualize.py
 """
 
-import json
 from collections import Counter
-import matplotlib.pyplot as plt
+from entity_table import load_parsed_results
 
-def analyze_parsed_resumes():
-    """Analyze parsed resumes and create visualizations"""
+def analyze_parsed_resumes(parsed_file='parsed_resumes.json'):
+    """Analyze parsed resumes and create visualizations
+    
+    `parsed_file` is parsed_resumes.json or a .ents entity table.
+    """
     
     # Load parsed resumes
     print("Loading parsed resumes...")
-    with open('parsed_resumes.json', 'r', encoding='utf-8') as f:
-        results = json.load(f)
+    results = load_parsed_results(parsed_file)
     
     print(f"Loaded {len(results)} parsed resumes\n")
     
@@ -75,6 +76,7 @@ def analyze_parsed_resumes():
 
 def create_charts(top_skills, top_titles, skill_count, job_title_count, total_resumes):
     """Create visualization charts"""
+    import matplotlib.pyplot as plt
     
     print("\n📈 Creating visualizations...")
     
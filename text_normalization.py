@@ -0,0 +1,159 @@
+# text_normalization.py
+"""
+Clean up PDF/DOCX extraction noise before tokenization
+Collapses whitespace padding (" \n \n \n"), rejoins hyphenated words
+("high -speed") and drops icon-font words ("CLIPBOARD", "GRADUATION
+-CAP"). A split-off last letter ("differentia l") is rejoined only when
+a vocabulary says the joined word is the more common one, since
+"with t h" or "grade b" look the same; default_normalizer() builds that
+vocabulary from the annotated training texts. Every rule only deletes
+characters, so an offset map from the cleaned text back to the
+original is exact.
+"""
+
+import json
+import os
+import re
+from array import array
+from collections import Counter
+
+# Annotated texts that the split-word vocabulary is counted from
+VOCABULARY_SOURCE = 'training_data.json'
+
+# Icon-font glyph names that PDF extraction emits as words. Hyphenated
+# names match in any case and with PDF-style " -" splits; single words
+# only match in capitals so ordinary text is left alone.
+ICON_WORDS = [
+    'ALIGN-JUSTIFY', 'GRADUATION-CAP', 'MAP-MARKER', 'MAP-MARKER-ALT', 'PHONE-ALT',
+    'MOBILE-ALT', 'ENVELOPE-OPEN', 'USER-GRADUATE', 'LAPTOP-CODE', 'EXTERNAL-LINK',
+    'EXTERNAL-LINK-ALT', 'CHECK-CIRCLE', 'CALENDAR-ALT', 'GLOBE-AMERICAS',
+    'CLIPBOARD', 'ENVELOPE', 'BRIEFCASE', 'TROPHY', 'GLOBE', 'COGS',
+]
+
+class NormalizedText:
+    """Cleaned text plus a map from each cleaned offset to its original offset"""
+    
+    def __init__(self, text, offsets):
+        self.text = text
+        self.offsets = offsets  # len(text) + 1 entries; last one is len(original)
+    
+    def to_original(self, start, end):
+        """Map a [start, end) span in the cleaned text back to the original"""
+        if start >= end:
+            return self.offsets[start], self.offsets[start]
+        return self.offsets[start], self.offsets[end - 1] + 1
+
+class TextNormalizer:
+    """Configurable deletion-only cleanup of extracted resume text"""
+    
+    def __init__(self, collapse_whitespace=True, join_hyphenation=True,
+                 join_split_words=False, strip_icons=True, icon_words=None, vocabulary=None):
+        """`join_split_words` only joins where `vocabulary` (lowercase
+        word counts, or a set of words) has the joined word more often
+        than the left piece; it does nothing without a vocabulary.
+        """
+        self.collapse_whitespace = collapse_whitespace
+        self.join_hyphenation = join_hyphenation
+        self.join_split_words = join_split_words
+        self.strip_icons = strip_icons
+        self.vocabulary = vocabulary
+        
+        icons = ICON_WORDS if icon_words is None else icon_words
+        hyphenated = [r'\s?-\s?'.join(map(re.escape, word.split('-'))) for word in icons if '-' in word]
+        single = [re.escape(word) for word in icons if '-' not in word]
+        patterns = []
+        if hyphenated:
+            patterns.append(r'(?i:\b(?:' + '|'.join(hyphenated) + r')\b)')
+        if single:
+            patterns.append(r'\b(?:' + '|'.join(single) + r')\b')
+        self.icon_pattern = re.compile(r'(?:' + '|'.join(patterns) + r')[ \t]*') if patterns else None
+        
+        # "high -speed" -> "high-speed": drop the space before a hyphen inside a word
+        self.hyphen_pattern = re.compile(r'(?<=\w) (?=-\w)')
+        # "differentia l" -> "differential": a lone trailing letter split off a word
+        self.split_word_pattern = re.compile(r'(\b[A-Za-z]*[a-z]{4}) ([b-hj-z])(?![\w-])')
+        self.whitespace_pattern = re.compile(r'\s{2,}')
+    
+    def _deletions(self, text):
+        """Collect (start, end) ranges to delete, in order and non-overlapping"""
+        spans = []
+        if self.strip_icons and self.icon_pattern is not None:
+            spans.extend(m.span() for m in self.icon_pattern.finditer(text))
+        if self.join_hyphenation:
+            spans.extend(m.span() for m in self.hyphen_pattern.finditer(text))
+        if self.join_split_words and self.vocabulary:
+            for match in self.split_word_pattern.finditer(text):
+                stem, letter = match.group(1).lower(), match.group(2)
+                if self._frequency(stem + letter) > self._frequency(stem):
+                    spans.append((match.end(1), match.end(1) + 1))
+        if self.collapse_whitespace:
+            for match in self.whitespace_pattern.finditer(text):
+                spans.extend(self._collapse_run(match.start(), match.group()))
+        return _merge_spans(spans)
+    
+    def _frequency(self, word):
+        if isinstance(self.vocabulary, dict):
+            return self.vocabulary.get(word, 0)
+        return int(word in self.vocabulary)
+    
+    @staticmethod
+    def _collapse_run(offset, run):
+        """Deletion ranges that reduce a whitespace run to at most two newlines or one space"""
+        newlines = [i for i, char in enumerate(run) if char == '\n'][:2]
+        keep = newlines or [0]
+        deletions = []
+        previous = 0
+        for index in keep:
+            if index > previous:
+                deletions.append((offset + previous, offset + index))
+            previous = index + 1
+        if previous < len(run):
+            deletions.append((offset + previous, offset + len(run)))
+        return deletions
+    
+    def normalize(self, text):
+        """Return a NormalizedText for `text`"""
+        pieces = []
+        offsets = array('l')
+        position = 0
+        for start, end in self._deletions(text):
+            if start > position:
+                pieces.append(text[position:start])
+                offsets.extend(range(position, start))
+            position = end
+        pieces.append(text[position:])
+        offsets.extend(range(position, len(text)))
+        offsets.append(len(text))
+        return NormalizedText(''.join(pieces), offsets)
+    
+    def clean(self, text):
+        """Just the cleaned string, when offsets are not needed"""
+        return self.normalize(text).text
+
+def load_vocabulary(path=VOCABULARY_SOURCE):
+    """Lowercase word counts over the texts of a training_data.json style file, or None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    counts = Counter()
+    for item in data:
+        text = item['text'] if isinstance(item, dict) else item[0]
+        counts.update(re.findall(r'[a-z]+', text.lower()))
+    return counts
+
+def default_normalizer(vocabulary_path=VOCABULARY_SOURCE):
+    """TextNormalizer with split-word joining on when a vocabulary file is available"""
+    vocabulary = load_vocabulary(vocabulary_path)
+    return TextNormalizer(join_split_words=vocabulary is not None, vocabulary=vocabulary)
+
+def _merge_spans(spans):
+    """Sort and merge overlapping (start, end) ranges"""
+    merged = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
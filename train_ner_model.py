@@ -5,11 +5,20 @@ Usage: python train_ner_model.py
 """
 
 import spacy
-from spacy.training import Example
-from spacy.util import minibatch, compounding
+from spacy.util import fix_random_seed
+import hashlib
+import multiprocessing
+import numpy
+import os
+import pickle
 import random
+import shutil
 import json
+from collections import Counter, defaultdict
 from pathlib import Path
+from evaluate_visualise import score_spans, precision_recall_f1
+from training_corpus import TrainingCorpus, unannotated_doc
+from batching import bucketed_batches
 
 def load_training_data(file_path='training_data.json'):
     """Load annotated training data"""
@@ -18,15 +27,240 @@ def load_training_data(file_path='training_data.json'):
     print(f"Loaded {len(data)} training examples")
     return data
 
-def train_ner_model(train_data, n_iter=30, output_dir='./resume_ner_model'):
-    """Train custom NER model"""
+def _training_batches(corpus, hashes, max_batch_tokens):
+    """Shuffled, length-bucketed batches of Examples, one shard's worth at a time"""
+    return bucketed_batches(corpus.iter_examples(hashes, shuffle=True), lambda example: len(example.predicted),
+                            max_batch_tokens, buffer_size=corpus.shard_size, shuffle=True)
+
+def _collect_gradients(model):
+    """Accumulated gradients keyed by (node position, param name)"""
+    return {(index, name): node.get_grad(name)
+            for index, node in enumerate(model.walk())
+            for name in node.param_names if node.has_grad(name)}
+
+def _average_gradients(contributions):
+    """Average per-worker gradients, weighted by each worker's batch size"""
+    totals, weights = {}, {}
+    for gradients, n_examples in contributions:
+        for key, gradient in gradients.items():
+            if key in totals:
+                totals[key] += gradient * n_examples
+            else:
+                totals[key] = gradient * n_examples
+            weights[key] = weights.get(key, 0) + n_examples
+    return {key: total / weights[key] for key, total in totals.items()}
+
+def _apply_gradients(nlp, gradients, optimizer):
+    """Load averaged gradients into the NER model and take one optimizer step"""
+    ner = nlp.get_pipe("ner")
+    nodes = list(ner.model.walk())
+    for (index, name), gradient in gradients.items():
+        nodes[index].set_grad(name, gradient)
+    ner.finish_update(optimizer)
+
+def _train_worker(conn, nlp, optimizer, corpus, hashes, max_batch_tokens, seed):
+    """Replica loop: compute gradients on local shards, apply the averaged ones
+    
+    Every replica starts from the same forked weights and optimizer state
+    and applies the same averaged gradients, so they stay in sync without
+    ever shipping weights around.
+    """
+    fix_random_seed(seed)
+    batches = iter(())
+    while True:
+        command, payload = conn.recv()
+        if command == 'epoch':
+            batches = _training_batches(corpus, hashes, max_batch_tokens)
+        elif command == 'step':
+            batch = next(batches, None)
+            if batch is None:
+                conn.send(None)
+                continue
+            losses = {}
+            # sgd=False accumulates gradients without touching the weights
+            nlp.update(batch, drop=0.5, losses=losses, sgd=False)
+            conn.send((_collect_gradients(nlp.get_pipe("ner").model), len(batch), losses.get('ner', 0.0)))
+        elif command == 'apply':
+            _apply_gradients(nlp, payload, optimizer)
+        else:
+            break
+    conn.close()
+
+class DataParallelTrainer:
+    """Synchronous data-parallel training over forked replicas
+    
+    Shards are split across workers. Each step every worker backprops one
+    local batch, the parent averages the gradients and every replica
+    (the parent included) applies the same update.
+    """
+    
+    def __init__(self, nlp, optimizer, corpus, partitions, max_batch_tokens, seed=0):
+        self.nlp = nlp
+        self.optimizer = optimizer
+        context = multiprocessing.get_context('fork')
+        self.connections, self.workers = [], []
+        for rank, hashes in enumerate(partitions):
+            parent_conn, child_conn = context.Pipe()
+            worker = context.Process(target=_train_worker,
+                                     args=(child_conn, nlp, optimizer, corpus, hashes, max_batch_tokens, seed + rank),
+                                     daemon=True)
+            worker.start()
+            child_conn.close()
+            self.connections.append(parent_conn)
+            self.workers.append(worker)
+    
+    def train_epoch(self):
+        """Run one pass over every worker's shards; returns the summed loss"""
+        for conn in self.connections:
+            conn.send(('epoch', None))
+        loss = 0.0
+        while True:
+            for conn in self.connections:
+                conn.send(('step', None))
+            replies = [reply for reply in (conn.recv() for conn in self.connections) if reply is not None]
+            if not replies:
+                return loss
+            averaged = _average_gradients((gradients, n_examples) for gradients, n_examples, _ in replies)
+            # Send before applying locally: the optimizer zeroes the gradient arrays in place
+            for conn in self.connections:
+                conn.send(('apply', averaged))
+            _apply_gradients(self.nlp, averaged, self.optimizer)
+            loss += sum(batch_loss for _, _, batch_loss in replies)
+    
+    def close(self):
+        """Stop the workers"""
+        for conn in self.connections:
+            conn.send(('stop', None))
+            conn.close()
+        for worker in self.workers:
+            worker.join()
+
+def _train_epoch(nlp, optimizer, corpus, hashes, max_batch_tokens):
+    """One single-process pass over `hashes`; returns the summed loss"""
+    losses = {}
+    
+    # Batch examples
+    batches = _training_batches(corpus, hashes, max_batch_tokens)
+    
+    for examples in batches:
+        # Update model
+        nlp.update(examples, drop=0.5, losses=losses, sgd=optimizer)
+    return losses.get('ner', 0.0)
+
+def evaluate_dev(nlp, corpus, hashes, batch_size=64):
+    """Exact-match (precision, recall, F1) on compiled dev examples"""
+    stats = defaultdict(Counter)
+    docs = nlp.pipe(((unannotated_doc(reference), reference.user_data['entities'])
+                     for reference in corpus.iter_docs(hashes)),
+                    as_tuples=True, batch_size=batch_size)
+    for doc, entities in docs:
+        predicted = {(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents}
+        score_spans({tuple(ent) for ent in entities}, predicted, stats)
+    
+    totals = Counter()
+    for label_stats in stats.values():
+        totals.update(label_stats)
+    return precision_recall_f1(totals['tp'], totals['fp'], totals['fn'])
+
+def _rekey_optimizer(optimizer, mapping):
+    """Rename the optimizer's per-parameter state from one set of node keys to another"""
+    for table_name in ('mom1', 'mom2', 'averages', 'nr_update', 'last_seen'):
+        table = getattr(optimizer, table_name)
+        if not table:
+            continue
+        entries = list(table.items())
+        table.clear()
+        for (node_key, param_name), value in entries:
+            if node_key in mapping:
+                table[(mapping[node_key], param_name)] = value
+
+def save_checkpoint(checkpoint_dir, nlp, optimizer, state):
+    """Write weights, optimizer and RNG state, then atomically point state.json at them
+    
+    Optimizer state is keyed by node ids, which differ between processes,
+    so it is stored keyed by position in the model walk instead.
+    """
+    checkpoint_path = Path(checkpoint_dir)
+    checkpoint_path.mkdir(parents=True, exist_ok=True)
+    name = f"epoch-{state['epoch']:04d}"
+    nlp.to_disk(checkpoint_path / name)
+    
+    model = nlp.get_pipe("ner").model
+    to_position = {node.id: index for index, node in enumerate(model.walk())}
+    _rekey_optimizer(optimizer, to_position)
+    try:
+        with open(checkpoint_path / name / 'training_state.pkl', 'wb') as f:
+            pickle.dump({'optimizer': optimizer, 'random': random.getstate(),
+                         'numpy_random': numpy.random.get_state()}, f)
+    finally:
+        _rekey_optimizer(optimizer, {index: node_id for node_id, index in to_position.items()})
+    
+    tmp_path = checkpoint_path / f"state.json.tmp{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(dict(state, model=name), f, indent=2)
+    os.replace(tmp_path, checkpoint_path / 'state.json')
+    
+    # Older epochs and best models are only removed once the new state is in place
+    for old in [*checkpoint_path.glob('epoch-*'), *checkpoint_path.glob('best-*')]:
+        if old.name not in (name, state.get('best_model')):
+            shutil.rmtree(old, ignore_errors=True)
+
+def load_checkpoint(checkpoint_dir, nlp, data_digest):
+    """Restore weights and RNG state in place; returns (state, optimizer) or None
+    
+    A checkpoint trained on different data is ignored.
+    """
+    state_path = Path(checkpoint_dir) / 'state.json'
+    if not state_path.exists():
+        return None
+    with open(state_path, 'r', encoding='utf-8') as f:
+        state = json.load(f)
+    if state['data'] != data_digest:
+        print(f"⚠️  Ignoring checkpoint in {checkpoint_dir}: it was trained on different data")
+        return None
+    
+    model_path = Path(checkpoint_dir) / state['model']
+    nlp.from_disk(model_path)
+    with open(model_path / 'training_state.pkl', 'rb') as f:
+        training_state = pickle.load(f)
+    
+    optimizer = training_state['optimizer']
+    model = nlp.get_pipe("ner").model
+    _rekey_optimizer(optimizer, {index: node.id for index, node in enumerate(model.walk())})
+    random.setstate(training_state['random'])
+    numpy.random.set_state(training_state['numpy_random'])
+    return state, optimizer
+
+def train_ner_model(train_data, n_iter=30, output_dir='./resume_ner_model',
+                    n_workers=1, corpus_dir='./training_corpus', shard_size=500,
+                    dev_data=None, patience=5, min_epochs=10, checkpoint_dir='./training_checkpoint', resume=True,
+                    max_batch_tokens=3000, ner_config=None):
+    """Train custom NER model
+    
+    Examples are compiled once into the cached DocBin corpus (see
+    training_corpus.py) and streamed from disk every epoch. With
+    n_workers > 1, shards are trained data-parallel across forked
+    processes with gradient averaging; the worker count is capped at the
+    number of shards. Batches group examples of similar length and hold
+    at most `max_batch_tokens` padded tokens. `ner_config` overrides the
+    NER component config (e.g. a smaller model architecture).
+    
+    With `dev_data`, F1 is measured after every epoch, the best model so
+    far is kept in the checkpoint directory, and training stops once F1
+    has not improved for `patience` epochs (but not before `min_epochs`).
+    A checkpoint is written every epoch and, with `resume`, an
+    interrupted run on the same data picks up from it. Only when
+    training finishes is the best model copied to `output_dir` and the
+    checkpoint removed, so an interrupted run never replaces the model
+    in `output_dir`.
+    """
     
     # Create blank English model
     nlp = spacy.blank("en")
     
     # Add NER pipe
     if "ner" not in nlp.pipe_names:
-        ner = nlp.add_pipe("ner")
+        ner = nlp.add_pipe("ner", config=ner_config or {})
     else:
         ner = nlp.get_pipe("ner")
     
@@ -36,44 +270,80 @@ def train_ner_model(train_data, n_iter=30, output_dir='./resume_ner_model'):
         for ent in annotations.get("entities", []):
             ner.add_label(ent[2])
     
+    # Only examples not already in the cached corpus get tokenized
+    corpus = TrainingCorpus(nlp, corpus_dir, shard_size)
+    hashes = corpus.compile(train_data)
+    dev_hashes = corpus.compile(dev_data) if dev_data else []
+    partitions = corpus.partition(hashes, n_workers)
+    n_workers = len(partitions)
+    data_digest = hashlib.sha256(''.join(hashes + ['|'] + dev_hashes).encode('ascii')).hexdigest()
+    
     # Get other pipes to disable during training
     other_pipes = [pipe for pipe in nlp.pipe_names if pipe != "ner"]
-    
-    print(f"\nTraining for {n_iter} iterations...")
-    print("This will take 10-30 minutes...\n")
+    output_path = Path(output_dir)
     
     # Training loop
     with nlp.disable_pipes(*other_pipes):
         # Initialize optimizer
         optimizer = nlp.initialize()
+        state = {'epoch': 0, 'best_f1': -1.0, 'best_epoch': 0, 'bad_epochs': 0, 'data': data_digest}
         
-        for iteration in range(n_iter):
-            random.shuffle(train_data)
-            losses = {}
-            
-            # Batch examples
-            batches = minibatch(train_data, size=compounding(4.0, 32.0, 1.001))
-            
-            for batch in batches:
-                examples = []
-                for text, annotations in batch:
-                    doc = nlp.make_doc(text)
-                    example = Example.from_dict(doc, annotations)
-                    examples.append(example)
+        checkpoint = load_checkpoint(checkpoint_dir, nlp, data_digest) if resume else None
+        if checkpoint:
+            state, optimizer = checkpoint
+            print(f"\nResuming from {checkpoint_dir} after epoch {state['epoch']}")
+        
+        print(f"\nTraining for up to {n_iter} iterations on {n_workers} worker(s)...")
+        print("This will take 10-30 minutes...\n")
+        
+        trainer = None
+        if n_workers > 1:
+            trainer = DataParallelTrainer(nlp, optimizer, corpus, partitions, max_batch_tokens, seed=state['epoch'] * n_workers)
+        try:
+            for iteration in range(state['epoch'], n_iter):
+                if trainer:
+                    loss = trainer.train_epoch()
+                else:
+                    loss = _train_epoch(nlp, optimizer, corpus, hashes, max_batch_tokens)
+                state['epoch'] = iteration + 1
                 
-                # Update model
-                nlp.update(examples, drop=0.5, losses=losses, sgd=optimizer)
-            
-            if (iteration + 1) % 5 == 0:
-                print(f"Iteration {iteration + 1}/{n_iter} - Loss: {losses['ner']:.2f}")
+                if not dev_hashes:
+                    print(f"Iteration {iteration + 1}/{n_iter} - Loss: {loss:.2f}")
+                else:
+                    precision, recall, f1 = evaluate_dev(nlp, corpus, dev_hashes)
+                    marker = ''
+                    if f1 > state['best_f1']:
+                        best_model = f"best-{iteration + 1:04d}"
+                        Path(checkpoint_dir).mkdir(parents=True, exist_ok=True)
+                        nlp.to_disk(Path(checkpoint_dir) / best_model)
+                        state.update(best_f1=f1, best_epoch=iteration + 1, bad_epochs=0,
+                                     best_model=best_model)
+                        marker = ' ✅ best'
+                    else:
+                        state['bad_epochs'] += 1
+                    print(f"Iteration {iteration + 1}/{n_iter} - Loss: {loss:.2f} - Dev P/R/F1: "
+                          f"{precision * 100:.1f}/{recall * 100:.1f}/{f1 * 100:.1f}{marker}")
+                
+                save_checkpoint(checkpoint_dir, nlp, optimizer, state)
+                # Dev F1 sits near 0 for the first epochs from a blank model, so
+                # patience only applies from min_epochs on
+                if dev_hashes and state['bad_epochs'] >= patience and state['epoch'] >= min_epochs:
+                    print(f"\nStopping early: no dev F1 improvement in {patience} epochs")
+                    break
+        finally:
+            if trainer:
+                trainer.close()
     
     # Save model
-    output_path = Path(output_dir)
-    if not output_path.exists():
-        output_path.mkdir()
-    
-    nlp.to_disk(output_path)
-    print(f"\n✅ Model saved to: {output_dir}")
+    if dev_hashes and state.get('best_model'):
+        nlp.from_disk(Path(checkpoint_dir) / state['best_model'])
+        nlp.to_disk(output_path)
+        print(f"\n✅ Best model (epoch {state['best_epoch']}, dev F1 {state['best_f1'] * 100:.1f}%) "
+              f"saved to: {output_dir}")
+    else:
+        nlp.to_disk(output_path)
+        print(f"\n✅ Model saved to: {output_dir}")
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
     
     return nlp
 
@@ -117,8 +387,8 @@ def main():
     print(f"\nTrain set: {len(train_set)} examples")
     print(f"Validation set: {len(val_set)} examples")
     
-    # Train model
-    nlp = train_ner_model(train_set, n_iter=30)
+    # Train model (one worker per core; 500-example shards are the unit of parallelism)
+    nlp = train_ner_model(train_set, n_iter=30, n_workers=os.cpu_count(), dev_data=val_set)
     
     # Test model
     test_model()
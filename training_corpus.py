@@ -0,0 +1,160 @@
+# training_corpus.py
+"""
+Compile annotated data into a cached binary (DocBin) corpus
+Usage: python training_corpus.py [training_data.json] [corpus_dir]
+
+Each example is tokenized and aligned once and stored in a DocBin shard
+under a directory keyed by the tokenizer's fingerprint. Examples are
+addressed by a hash of their text and annotations, so recompiling after
+new annotations only tokenizes the new ones, and changing the tokenizer
+starts a fresh corpus. Training and evaluation stream shards from here.
+"""
+
+import hashlib
+import json
+import os
+import random
+import sys
+import spacy
+from pathlib import Path
+from spacy.tokens import Doc, DocBin
+from spacy.training import Example
+
+MANIFEST_NAME = 'manifest.json'
+
+def example_hash(text, annotations):
+    """Content hash of one annotated example"""
+    payload = json.dumps([text, annotations], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def tokenizer_fingerprint(nlp):
+    """Hash of everything that decides how text is split into tokens"""
+    digest = hashlib.sha256()
+    digest.update(nlp.lang.encode('utf-8'))
+    digest.update(json.dumps(dict(nlp.config['nlp']['tokenizer']), sort_keys=True).encode('utf-8'))
+    digest.update(nlp.tokenizer.to_bytes(exclude=['vocab']))
+    return digest.hexdigest()[:16]
+
+def unannotated_doc(reference):
+    """Same tokens as `reference` with no annotations, without re-tokenizing"""
+    return Doc(reference.vocab, words=[token.text for token in reference],
+               spaces=[bool(token.whitespace_) for token in reference])
+
+class TrainingCorpus:
+    """DocBin shards plus a manifest mapping example hashes to shard positions"""
+    
+    def __init__(self, nlp, corpus_dir='./training_corpus', shard_size=500):
+        self.nlp = nlp
+        self.shard_size = shard_size
+        self.fingerprint = tokenizer_fingerprint(nlp)
+        self.path = Path(corpus_dir) / self.fingerprint
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.manifest_path = self.path / MANIFEST_NAME
+        
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        else:
+            # shards: [name, n_docs]; examples: hash -> [shard index, position, n_tokens]
+            self.manifest = {'fingerprint': self.fingerprint, 'shards': [], 'examples': {}}
+    
+    def __len__(self):
+        return len(self.manifest['examples'])
+    
+    def compile(self, data):
+        """Add any examples of `data` not yet in the corpus; returns their hashes in order"""
+        examples = self.manifest['examples']
+        hashes = [example_hash(text, annotations) for text, annotations in data]
+        
+        new = {}
+        for key, (text, annotations) in zip(hashes, data):
+            if key not in examples and key not in new:
+                new[key] = (text, annotations)
+        if new:
+            self._append(new)
+        
+        print(f"Corpus {self.fingerprint}: {len(new)} new, {len(data) - len(new)} cached examples")
+        return hashes
+    
+    def _append(self, new):
+        """Tokenize new examples into the open shard, starting new shards as they fill"""
+        shards = self.manifest['shards']
+        examples = self.manifest['examples']
+        pending = list(new.items())
+        
+        while pending:
+            if shards and shards[-1][1] < self.shard_size:
+                index = len(shards) - 1
+                doc_bin = DocBin(store_user_data=True).from_disk(self.path / shards[index][0])
+            else:
+                index = len(shards)
+                shards.append([f"shard-{index:05d}.spacy", 0])
+                doc_bin = DocBin(store_user_data=True)
+            
+            room = self.shard_size - shards[index][1]
+            batch, pending = pending[:room], pending[room:]
+            for key, (text, annotations) in batch:
+                # The reference doc carries the aligned gold entities (misaligned ones
+                # stay missing); the raw character spans ride along for evaluation
+                reference = Example.from_dict(self.nlp.make_doc(text), annotations).reference
+                reference.user_data['entities'] = [list(ent) for ent in annotations.get('entities', [])]
+                examples[key] = [index, len(doc_bin), len(reference)]
+                doc_bin.add(reference)
+            
+            shard_path = self.path / shards[index][0]
+            tmp_path = shard_path.with_name(f"{shard_path.name}.tmp{os.getpid()}")
+            doc_bin.to_disk(tmp_path)
+            os.replace(tmp_path, shard_path)
+            shards[index][1] = len(doc_bin)
+        
+        # Written last, so an interrupted compile never points at missing docs
+        tmp_path = self.manifest_path.with_name(f"{MANIFEST_NAME}.tmp{os.getpid()}")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f)
+        os.replace(tmp_path, self.manifest_path)
+    
+    def partition(self, hashes, n_parts):
+        """Split `hashes` into at most `n_parts` groups of whole shards"""
+        by_shard = {}
+        for key in hashes:
+            by_shard.setdefault(self.manifest['examples'][key][0], []).append(key)
+        groups = list(by_shard.values())
+        n_parts = max(1, min(n_parts, len(groups)))
+        return [[key for group in groups[part::n_parts] for key in group] for part in range(n_parts)]
+    
+    def iter_docs(self, hashes, shuffle=False):
+        """Stream reference docs for `hashes`, one shard in memory at a time
+        
+        Docs come shard by shard, in `hashes` order within each shard.
+        """
+        by_shard = {}
+        for key in hashes:
+            index, position, _ = self.manifest['examples'][key]
+            by_shard.setdefault(index, []).append(position)
+        
+        shard_order = list(by_shard)
+        if shuffle:
+            random.shuffle(shard_order)
+        for index in shard_order:
+            shard_path = self.path / self.manifest['shards'][index][0]
+            docs = list(DocBin(store_user_data=True).from_disk(shard_path).get_docs(self.nlp.vocab))
+            positions = by_shard[index]
+            if shuffle:
+                random.shuffle(positions)
+            for position in positions:
+                yield docs[position]
+    
+    def iter_examples(self, hashes, shuffle=False):
+        """Stream training Examples for `hashes`"""
+        for reference in self.iter_docs(hashes, shuffle=shuffle):
+            yield Example(unannotated_doc(reference), reference)
+
+if __name__ == "__main__":
+    DATA_PATH = sys.argv[1] if len(sys.argv) > 1 else 'training_data.json'
+    CORPUS_DIR = sys.argv[2] if len(sys.argv) > 2 else './training_corpus'
+    
+    with open(DATA_PATH, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    corpus = TrainingCorpus(spacy.blank("en"), CORPUS_DIR)
+    corpus.compile(data)
+    print(f"✅ {len(corpus)} examples in {len(corpus.manifest['shards'])} shard(s) at {corpus.path}")